@@ -11,6 +11,7 @@ and only needs to be defined once per user / group / etc.
 
 import os
 import math
+from functools import cached_property
 
 import luigi
 import law
@@ -41,6 +42,16 @@ class Task(law.Task):
             "This name is also used as the identifier for the configuration file")
     run_pdfas_uncerts = luigi.BoolParameter(description="Run extra variations for pdf and alpha_s uncertainties.")
 
+    @cached_property
+    def analysis_path(self):
+        # ANALYSIS_PATH is defined in setup.sh
+        return os.environ["ANALYSIS_PATH"]
+
+    @property
+    def scenario_config_path(self):
+        return os.path.join(self.analysis_path, "models",
+                            "{}.yaml".format(self.scenario))
+
     def store_parts(self):
         return (self.__class__.__name__, self.scenario, self.version)
 
@@ -91,24 +102,24 @@ class HTCondorWorkflow(law.htcondor.HTCondorWorkflow):
 
     def htcondor_job_config(self, config, job_num, branches):
         # render_variables are rendered into all files sent with a job
-        config.render_variables["analysis_path"] = os.getenv("ANALYSIS_PATH")
-
-        # force to run on CC7, http://batchdocs.web.cern.ch/batchdocs/local/submit.html#os-choice
-        config.custom_content.append(("Requirements", self.htcondor_requirements))
-        config.custom_content.append(("+RemoteJob", self.htcondor_remote_job))
-        config.custom_content.append(("accounting_group", self.htcondor_accounting_group))
-        config.custom_content.append(("universe", self.htcondor_universe))
-        config.custom_content.append(("docker_image", self.htcondor_docker_image))
-        config.custom_content.append(("+RequestWalltime", self.htcondor_walltime))
-        config.custom_content.append(("request_cpus", self.htcondor_request_cpus))
-        config.custom_content.append(("RequestMemory", self.htcondor_request_memory))
-        config.custom_content.append(("RequestDisk", self.htcondor_request_disk))
-
-        # copy the entire environment
-        config.custom_content.append(("getenv", "true"))
-
-        # the CERN htcondor setup requires a "log" config, but we can safely set it to /dev/null
-        # if you are interested in the logs of the batch system itself, set a meaningful value here
-        config.custom_content.append(("log", "/dev/null"))
+        config.render_variables["analysis_path"] = self.analysis_path
+
+        config.custom_content.extend((
+            # force to run on CC7, http://batchdocs.web.cern.ch/batchdocs/local/submit.html#os-choice
+            ("Requirements", self.htcondor_requirements),
+            ("+RemoteJob", self.htcondor_remote_job),
+            ("accounting_group", self.htcondor_accounting_group),
+            ("universe", self.htcondor_universe),
+            ("docker_image", self.htcondor_docker_image),
+            ("+RequestWalltime", self.htcondor_walltime),
+            ("request_cpus", self.htcondor_request_cpus),
+            ("RequestMemory", self.htcondor_request_memory),
+            ("RequestDisk", self.htcondor_request_disk),
+            # copy the entire environment
+            ("getenv", "true"),
+            # the CERN htcondor setup requires a "log" config, but we can safely set it to /dev/null
+            # if you are interested in the logs of the batch system itself, set a meaningful value here
+            ("log", "/dev/null"),
+        ))
 
         return config
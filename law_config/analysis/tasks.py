@@ -8,24 +8,139 @@ The actual payload of the tasks is rather trivial.
 
 import yaml
 import os
+import pickle
+import re
 import shutil
+import tarfile
+import tempfile
+import threading
 import logging
-import glob
 logging.basicConfig(level=logging.INFO)
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from itertools import repeat
-from multiprocessing import Pool
 
 import law
 import luigi
 import thdm_scanner
 
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader
+
 
 # import our "framework" tasks
 from analysis.framework import Task, HTCondorWorkflow
 
 
+@lru_cache(maxsize=None)
+def _load_scenario(yaml_path):
+    # Parse the scenario configuration only once per process. The parsed
+    # config is additionally pickled next to the YAML file, keyed by the
+    # modification time and size of the YAML, so other processes can skip
+    # parsing.
+    scenario = os.path.splitext(os.path.basename(yaml_path))[0]
+    stat = os.stat(yaml_path)
+    cache_dir = os.path.join(os.path.dirname(yaml_path), ".cache")
+    cache_name = "{}.{}.{}.pkl".format(scenario, stat.st_mtime_ns,
+                                       stat.st_size)
+    cache_path = os.path.join(cache_dir, cache_name)
+    try:
+        with open(cache_path, "rb") as fi:
+            return pickle.load(fi)
+    except FileNotFoundError:
+        pass
+    except (EOFError, pickle.UnpicklingError):
+        logging.warning("Ignoring corrupt config cache {}".format(cache_path))
+    with open(yaml_path, "r") as fi:
+        config = yaml.load(fi, Loader=_YAMLLoader)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a unique temporary file first so that concurrent jobs,
+        # possibly on different hosts, never read a partially written cache.
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fo:
+                pickle.dump(config, fo, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        # Remove the caches of previous versions of the YAML file
+        stale_cache = re.compile(r"{}\.\d+\.\d+\.pkl".format(
+                                 re.escape(scenario)))
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.name != cache_name and stale_cache.fullmatch(entry.name):  # noqa: E501
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+    except OSError:
+        logging.warning("Could not write config cache {}".format(cache_path))
+    return config
+
+
+_MODEL_CACHE = {}
+
+
+def _get_model(yaml_path, include_pdfas_unc):
+    # Share the model of a scenario and its enumerated parameter
+    # points between all tasks of the process
+    key = (yaml_path, include_pdfas_unc)
+    cached = _MODEL_CACHE.get(key)
+    if cached is None:
+        config = _load_scenario(yaml_path)
+        model = thdm_scanner.THDMModel(
+                    config["name"],
+                    config["scan_parameter"],
+                    config["benchmark_parameter"],
+                    include_pdfas_unc=include_pdfas_unc
+                    )
+        cached = (model, list(model.parameter_points()))
+        _MODEL_CACHE[key] = cached
+    return cached
+
+
+def _unpacked_marker(infile):
+    # Name of the file marking a completely unpacked tarball
+    return ".{}.done".format(os.path.basename(infile.path))
+
+
 def load_tarballs(infile, outpath):
     infile.load(outpath)
+    # Only mark the tarball once all of its files have been extracted
+    open(os.path.join(outpath, _unpacked_marker(infile)), "w").close()
+
+
+def harvest_point(mod_pars, inputs, outpath, run_pdf_uncerts=False):
+    (par_1, val_1), (par_2, val_2) = mod_pars
+    # Collect results from written output files
+    model_point = thdm_scanner.THDMPoint((par_1, par_2),
+                                         (val_1, val_2))
+    model_point.cos_betal = inputs.cos_betal
+    # First collect results from 2HDMC calculations
+    thdm_harvester = thdm_scanner.THDMCHarvester(
+            outpath=outpath,
+            scan_parameters=(par_1, par_2)
+            )
+    thdm_harvester.set_inputs(inputs)
+    thdm_harvester.harvest_output(model_point)
+    # Collect results from SusHi calculations
+    sushi_harvester = thdm_scanner.SusHiHarvester(
+            outpath=outpath,
+            scan_parameters=(par_1, par_2),
+            run_pdf_uncerts=run_pdf_uncerts)
+    sushi_harvester.set_inputs(inputs)
+    sushi_harvester.harvest_output(model_point)
+    return model_point
+
+
+def tarball_unpacked(infile, unpacked_files):
+    # Files of a tarball interrupted while unpacking may be truncated,
+    # so only the marker written after a complete unpacking counts.
+    return _unpacked_marker(infile) in unpacked_files
 
 
 def create_inputs(mod_pars, model,
@@ -35,9 +150,8 @@ def create_inputs(mod_pars, model,
     # Build the dictionary of the inputs from the
     # fixed parameters of the model and the scanned values
     # to initialize the input object.
-    dicts = [model.fixed_model_params,
-             {par_1: float(val_1), par_2: float(val_2)}]
-    input_dict = {k: v for di in dicts for k, v in di.items()}
+    input_dict = {**model.fixed_model_params,
+                  par_1: float(val_1), par_2: float(val_2)}
     if hybrid_basis:
         inputs = thdm_scanner.THDMInput(**input_dict)
     else:
@@ -51,49 +165,58 @@ class PerformScan(Task, HTCondorWorkflow, law.LocalWorkflow):
     Some more information.
     """
 
+    pdf_workers = luigi.IntParameter(default=1,
+                                     significant=False,
+                                     description="Number of SusHi runs for pdf and alpha_s variations executed in parallel")
+
     def htcondor_job_config(self, config, job_num, branches):
         config = super().htcondor_job_config(config, job_num, branches)
         config.custom_content.append(("JobBatchName", "-".join(self.store_parts())))
         return config
 
 
-    def create_branch_map(self):
-        with open(os.getenv("ANALYSIS_PATH")+"/models/{}.yaml".format(self.scenario),
-                  "r") as fi:
-            config = yaml.safe_load(fi)
-        model = thdm_scanner.THDMModel(
-                    config["name"],
-                    config["scan_parameter"],
-                    config["benchmark_parameter"],
-                    include_pdfas_unc=self.run_pdfas_uncerts
-                    )
+    @cached_property
+    def _scenario_branch_map(self):
+        config = _load_scenario(self.scenario_config_path)
+        model, points = _get_model(self.scenario_config_path, self.run_pdfas_uncerts)
         # map branch indexes to ascii numbers from 97 to 122 ("a" to "z")
         return {i: create_inputs(mod_pars, model, hybrid_basis=not "physical_basis" in config.keys())
-                for i, mod_pars in enumerate(model.parameter_points())}
+                for i, mod_pars in enumerate(points)}
+
+    def create_branch_map(self):
+        # The branch map may be requested several times during scheduling,
+        # so the inputs are only built once per instance.
+        return self._scenario_branch_map
+
+    @cached_property
+    def scan_parameters(self):
+        return tuple(_load_scenario(self.scenario_config_path)["scan_parameter"])
 
     def output(self):
         # it's best practice to encode the branch number into the output target
         return self.local_target("output_{}.tar.gz".format(self.branch))
 
-    def run_point(self, inputs, outpath="output",
+    def run_point(self, inputs, scan_parameters, outpath="output",
                   hybrid_basis=True, run_pdf_uncerts=False):
         # Run 2HDMC calculations
-        with open(os.getenv("ANALYSIS_PATH")+"/models/{}.yaml".format(self.scenario),
-                  "r") as fi:
-            par_1, par_2 = yaml.safe_load(fi)["scan_parameter"].keys()
+        par_1, par_2 = scan_parameters
         thdm_runner = thdm_scanner.THDMCRunner(outpath=outpath,
                                                scan_parameters=(par_1, par_2))
         thdm_runner.set_inputs(inputs)
-        thdm_runner.run(hybrid_basis)
 
         # Run SusHi calculation separately for each Higgs boson
         sushi_runner = thdm_scanner.SusHiRunner(
                 outpath=outpath,
                 scan_parameters=(par_1, par_2),
-                run_pdf_uncerts=self.run_pdfas_uncerts
+                run_pdf_uncerts=self.run_pdfas_uncerts,
+                pdf_workers=self.pdf_workers
                 )
         sushi_runner.set_inputs(inputs)
-        sushi_runner.run(multiproc=False, hybrid_basis=hybrid_basis)
+        # SusHi does not depend on the 2HDMC output, run both at the same time
+        with ThreadPoolExecutor(1) as executor:
+            thdmc_run = executor.submit(thdm_runner.run, hybrid_basis)
+            sushi_runner.run(multiproc=False, hybrid_basis=hybrid_basis)
+            thdmc_run.result()
         return
 
     def run(self):
@@ -101,22 +224,17 @@ class PerformScan(Task, HTCondorWorkflow, law.LocalWorkflow):
         inp = self.branch_data
 
         if self.workflow == "local":
-            os.chdir(os.getenv("ANALYSIS_PATH"))
+            os.chdir(self.analysis_path)
             outpath = "output"
         else:
             outpath = os.getcwd()
+        par_1, par_2 = self.scan_parameters
         # actual payload: run 2HDMC and SusHi to get the values to collect
-        self.run_point(inp, outpath=outpath,
-                       hybrid_basis=not isinstance(inp, thdm_scanner.THDMPhysicsInput),
+        self.run_point(inp, (par_1, par_2), outpath=outpath,
+                       hybrid_basis=inp.hybrid_basis,
                        run_pdf_uncerts=self.run_pdfas_uncerts)
 
-        # use target formatters (implementing dump and load,
-        # based on the file extension)
-        # to write the output target
         output = self.output()
-        with open(os.getenv("ANALYSIS_PATH")+"/models/{}.yaml".format(self.scenario),
-                  "r") as fi:
-            par_1, par_2 = yaml.safe_load(fi)["scan_parameter"].keys()
         point_str = "{}.{}.{}.{}".format(par_1,
                                          getattr(inp, par_1),
                                          par_2,
@@ -127,13 +245,24 @@ class PerformScan(Task, HTCondorWorkflow, law.LocalWorkflow):
                      "SusHi.{}.H21.out".format(point_str),
                     ]
         if self.run_pdfas_uncerts:
-            for h in ["11", "12", "21"]:
-                file_list.extend(["SusHi.{}.H{}.pdf{}.out".format(point_str, h, i) for i in range(1, 103)])
-        # Check if all expected files have been written
-        for fi in file_list:
-            if not os.path.exists(os.path.join(outpath, fi)):
-                raise Exception("Not all outputs have been written...")
-        output.dump(map(os.path.join, repeat(outpath), file_list))
+            file_list.extend(["SusHi.{}.H{}.pdf{}.out".format(point_str, h, i)
+                              for h in ("11", "12", "21")
+                              for i in range(1, 103)])
+        # Check if all expected files have been written, listing the
+        # output directory once instead of checking each file separately
+        with os.scandir(outpath) as entries:
+            written = {entry.name for entry in entries}
+        missing = set(file_list) - written
+        if missing:
+            raise Exception("Not all outputs have been written... "
+                            "Missing files: {}".format(sorted(missing)))
+        # Write the tarball directly instead of using the target formatter
+        # to use the fastest gzip compression level, the text outputs
+        # compress well enough with it.
+        output.parent.touch()
+        with tarfile.open(output.path, "w:gz", compresslevel=1) as tar:
+            for fi in file_list:
+                tar.add(os.path.join(outpath, fi), arcname=fi)
 
 
 class CollectScan(Task):
@@ -142,6 +271,12 @@ class CollectScan(Task):
     """
 
     skip_unpacking = luigi.BoolParameter(description="Skip unpacking of tarballs for crashed collection")
+    unpack_workers = luigi.IntParameter(default=max(4, os.cpu_count() or 1),
+                                        significant=False,
+                                        description="Number of threads used to unpack the tarballs")
+    harvest_workers = luigi.IntParameter(default=os.cpu_count() or 1,
+                                         significant=False,
+                                         description="Number of processes used to harvest the results")
 
     def requires(self):
         # req() is defined on all tasks and handles the passing of all
@@ -156,56 +291,52 @@ class CollectScan(Task):
         return self.local_target(self.scenario + ".root")
 
     def run(self):
-        with open(os.getenv("ANALYSIS_PATH")+"/models/{}.yaml".format(self.scenario),
-                  "r") as fi:
-            config = yaml.safe_load(fi)
-        model = thdm_scanner.THDMModel(
-                config["name"],
-                config["scan_parameter"],
-                config["benchmark_parameter"],
-                include_pdfas_unc=self.run_pdfas_uncerts
-                )
+        model, points = _get_model(self.scenario_config_path, self.run_pdfas_uncerts)
+        # The model is shared within the process, start from an empty grid
+        model.clear_points()
         print("Status: Unzipping tarball results...")
+        tarball_path = os.path.join(os.getcwd(), "tarballs_results", self.scenario)
+        if not self.skip_unpacking:
+            # Only unpack tarballs not already completely unpacked,
+            # e.g. by a previous crashed collection.
+            os.makedirs(tarball_path, exist_ok=True)
+            with os.scandir(tarball_path) as entries:
+                unpacked_files = {entry.name for entry in entries}
+            tarballs = [target
+                        for target in self.input()["collection"].targets.values()
+                        if not tarball_unpacked(target, unpacked_files)]
+            # Unpacking is I/O bound, so threads avoid the pickling of the
+            # targets and the startup of extra interpreters.
+            with ThreadPoolExecutor(max_workers=self.unpack_workers) as executor:
+                list(executor.map(load_tarballs,
+                                  tarballs,
+                                  repeat(tarball_path)))
         print("Status: Parsing unzipped results...")
-        for i, mod_pars in enumerate(model.parameter_points()):
-            (par_1, val_1), (par_2, val_2) = mod_pars
-            inputs = create_inputs(mod_pars, model,
-                                   hybrid_basis="physical_basis" not in config)
-            # Collect results from written output files
-            model_point = thdm_scanner.THDMPoint((par_1, par_2),
-                                                 (val_1, val_2))
-            model_point.cos_betal = inputs.cos_betal
-            # Running with pool not possible as class/instance methods are used
-            if self.skip_unpacking:
-                pass
-            else:
-                self.input()["collection"].targets[i].load(
-                       os.path.join(os.getcwd(), "tarballs_results", self.scenario))
-            # First collect results from 2HDMC calculations
-            thdm_harvester = thdm_scanner.THDMCHarvester(
-                    # outpath=os.getenv("ANALYSIS_DATA_PATH"),
-                    outpath=os.path.join(os.getcwd(), "tarballs_results/{}".format(self.scenario)),
-                    scan_parameters=(par_1, par_2)
-                    )
-            thdm_harvester.set_inputs(inputs)
-            thdm_harvester.harvest_output(model_point)
-            # Collect results from SusHi calculations
-            sushi_harvester = thdm_scanner.SusHiHarvester(
-                    # outpath=os.getenv("ANALYSIS_DATA_PATH"),
-                    outpath=os.path.join(os.getcwd(), "tarballs_results/{}".format(self.scenario)),
-                    scan_parameters=(par_1, par_2),
-                    run_pdf_uncerts=self.run_pdfas_uncerts)
-            sushi_harvester.set_inputs(inputs)
-            sushi_harvester.harvest_output(model_point)
-
-            # Add the harvested point to the model
-            model.add_point(model_point)
-            for fi in glob.glob(os.path.join("tarballs_results", self.scenario, "*.out")):
-                os.remove(fi)
+        # Reuse the inputs already built for the branches of the workflow
+        branch_map = self.requires().get_branch_map()
+        # Harvesting the points is independent, only adding them to the
+        # model has to happen in this process.
+        with ProcessPoolExecutor(max_workers=self.harvest_workers) as executor:
+            for model_point in executor.map(
+                    harvest_point,
+                    points,
+                    (branch_map[i] for i in range(len(points))),
+                    repeat(tarball_path),
+                    repeat(self.run_pdfas_uncerts),
+                    chunksize=16):
+                # Add the harvested point to the model
+                model.add_point(model_point)
         model.write_to_root()
         self.publish_message("\nbuilt THDM scan for model: {}\n".format(self.scenario))
         output = self.output()
         output.move_from_local(self.scenario + ".root")
-        # Clean up directory with unpacked tar files
+        # Clean up directory with unpacked tar files. The directory is
+        # renamed first so that the removal can run in the background
+        # without blocking the task or clashing with a new collection.
         print("Status: Cleaning up unzipped results...")
-        shutil.rmtree("tarballs_results/{}".format(self.scenario))
+        stale_path = os.path.join("tarballs_results",
+                                  ".stale.{}.{}".format(self.scenario,
+                                                        os.getpid()))
+        os.rename(tarball_path, stale_path)
+        threading.Thread(target=shutil.rmtree, args=(stale_path,),
+                         kwargs={"ignore_errors": True}).start()
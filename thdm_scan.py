@@ -4,11 +4,19 @@ import yaml
 import argparse
 import logging
 import os
-from itertools import repeat
 import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 import thdm_scanner
 
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader
+
 
 logger = logging.getLogger("")
 
@@ -64,10 +72,9 @@ def create_inputs(mod_pars, model,
     # Build the dictionary of the inputs from the
     # fixed parameters of the model and the scanned values
     # to initialize the input object.
-    dicts = [model.fixed_model_params,
-             {par_1: float(val_1), par_2: float(val_2)}]
-    input_dict = {k: v for di in dicts for k, v in di.items()}
-    print(input_dict)
+    input_dict = {**model.fixed_model_params,
+                  par_1: float(val_1), par_2: float(val_2)}
+    logger.debug("Inputs for model point: %s", input_dict)
     if hybrid_basis:
         inputs = thdm_scanner.THDMInput(**input_dict)
     else:
@@ -75,24 +82,28 @@ def create_inputs(mod_pars, model,
     return inputs
 
 
-def run_point(inputs, outpath="output",
+def run_point(inputs, scan_parameters, outpath="output",
               hybrid_basis=True, run_pdf_uncerts=False):
+    par_1, par_2 = scan_parameters
     # Run 2HDMC calculations
     thdm_runner = thdm_scanner.THDMCRunner(outpath=outpath,
                                            scan_parameters=(par_1, par_2))
     thdm_runner.set_inputs(inputs)
-    thdm_runner.run(hybrid_basis)
 
     # Run SusHi calculation separately for each Higgs boson
     sushi_runner = thdm_scanner.SusHiRunner(outpath=outpath,
                                             scan_parameters=(par_1, par_2),
                                             run_pdf_uncerts=run_pdf_uncerts)
     sushi_runner.set_inputs(inputs)
-    sushi_runner.run(multiproc=False, hybrid_basis=hybrid_basis)
+    # SusHi does not depend on the 2HDMC output, run both at the same time
+    with ThreadPoolExecutor(1) as executor:
+        thdmc_run = executor.submit(thdm_runner.run, hybrid_basis)
+        sushi_runner.run(multiproc=False, hybrid_basis=hybrid_basis)
+        thdmc_run.result()
     return
 
 
-def collect_result(inputs, outpath="output",
+def collect_result(mod_pars, inputs, outpath="output",
                    run_pdf_uncerts=False):
     (par_1, val_1), (par_2, val_2) = mod_pars
     # Collect results from written output files
@@ -100,24 +111,66 @@ def collect_result(inputs, outpath="output",
                                          (val_1, val_2))
     model_point.cos_betal = inputs.cos_betal
     # First collect results from 2HDMC calculations
-    thdm_harvester = THDMCHarvester(outpath=outpath,
-                                    scan_parameters=(par_1, par_2))
+    thdm_harvester = thdm_scanner.THDMCHarvester(
+            outpath=outpath,
+            scan_parameters=(par_1, par_2))
     thdm_harvester.set_inputs(inputs)
     thdm_harvester.harvest_output(model_point)
     # Collect results from SusHi calculations
-    sushi_harvester = SusHiHarvester(outpath=outpath,
-                                     scan_parameters=(par_1, par_2),
-                                     run_pdf_uncerts=run_pdf_uncerts)
+    sushi_harvester = thdm_scanner.SusHiHarvester(
+            outpath=outpath,
+            scan_parameters=(par_1, par_2),
+            run_pdf_uncerts=run_pdf_uncerts)
     sushi_harvester.set_inputs(inputs)
     sushi_harvester.harvest_output(model_point)
     return model_point
 
 
+# Settings of the scan, set once per worker process to avoid sending
+# them along with every parameter point.
+_MODEL = None
+_OUTPATH = "output"
+_HYBRID_BASIS = True
+_RUN_PDF_UNCERTS = False
+# Result grid of the model, shared between all worker processes
+_RESULTS = None
+_RESULTS_SHM = None
+
+
+def _init_worker(model, outpath="output",
+                 hybrid_basis=True, run_pdf_uncerts=False,
+                 results_name=None):
+    global _MODEL, _OUTPATH, _HYBRID_BASIS, _RUN_PDF_UNCERTS
+    global _RESULTS, _RESULTS_SHM
+    _MODEL = model
+    _OUTPATH = outpath
+    _HYBRID_BASIS = hybrid_basis
+    _RUN_PDF_UNCERTS = run_pdf_uncerts
+    if results_name is None:
+        _RESULTS = np.zeros(model.grid_shape, dtype=np.float64)
+    else:
+        _RESULTS_SHM = shared_memory.SharedMemory(name=results_name)
+        _RESULTS = np.ndarray(model.grid_shape, dtype=np.float64,
+                              buffer=_RESULTS_SHM.buf)
+
+
+def _run_model_point(mod_pars):
+    (par_1, _), (par_2, _) = mod_pars
+    inputs = create_inputs(mod_pars, _MODEL, hybrid_basis=_HYBRID_BASIS)
+    run_point(inputs, (par_1, par_2), _OUTPATH,
+              _HYBRID_BASIS, _RUN_PDF_UNCERTS)
+    # Harvest the point right away and write it to its cell of the
+    # result grid, so no results have to be sent back to the main process.
+    model_point = collect_result(mod_pars, inputs, _OUTPATH,
+                                 _RUN_PDF_UNCERTS)
+    _RESULTS[_MODEL.bin_index(model_point)] = _MODEL.point_values(model_point)
+
+
 def main(args):
     with open(args.config, "r") as fi:
-        config = yaml.load(fi, Loader=yaml.SafeLoader)
+        config = yaml.load(fi, Loader=_YAMLLoader)
 
-    print(config)
+    logger.debug("Scan configuration: %s", config)
     if args.output_path is None:
         # By default write into the current directory
         output_path = os.path.basename(args.config).replace(".yaml", "")
@@ -125,9 +178,8 @@ def main(args):
         output_path = os.path.join(args.output_path,
                                    os.path.basename(args.config).replace(".yaml", "")
         )
-    # Check if output directory exists, create it in case not
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
+    # Create the output directory in case it does not exist yet
+    os.makedirs(output_path, exist_ok=True)
     # For each parameter point
     model = thdm_scanner.THDMModel(config["name"],
                                    config["scan_parameter"],
@@ -138,25 +190,34 @@ def main(args):
         hybrid_basis = True
     else:
         hybrid_basis = False
+    # Enumerate the grid once before running the points
+    points = list(model.parameter_points())
+    worker_args = (model, output_path, hybrid_basis, args.run_pdfas_uncerts)
     if args.procs > 1:
-        with multiprocessing.Pool(args.procs) as pool:
-            pool.starmap(run_point,
-                         zip(map(create_inputs, model.parameter_points(), repeat(model)),
-                         repeat(output_path),
-                         repeat(hybrid_basis),
-                         repeat(args.run_pdfas_uncerts)))
+        # The zero-initialized result grid is filled by the workers
+        results_shm = shared_memory.SharedMemory(
+                create=True,
+                size=int(np.prod(model.grid_shape)) * np.dtype(np.float64).itemsize)
+        try:
+            with multiprocessing.Pool(args.procs,
+                                      initializer=_init_worker,
+                                      initargs=worker_args + (results_shm.name,)) as pool:
+                # Results are written to the shared grid, so the points
+                # can finish in any order.
+                for _ in pool.imap_unordered(
+                        _run_model_point, points,
+                        chunksize=max(1, len(points) // (args.procs * 8))):
+                    pass
+            model.set_results(np.ndarray(model.grid_shape, dtype=np.float64,
+                                         buffer=results_shm.buf).copy())
+        finally:
+            results_shm.close()
+            results_shm.unlink()
     else:
-        for mod_pars in model.parameter_points():
-            inputs = create_inputs(mod_pars, model, hybrid_basis=hybrid_basis)
-            run_point(inputs,
-                      output_path, hybrid_basis,
-                      args.run_pdfas_uncerts))
-
-    for mod_pars in model.parameter_points():
-        # Add model point to grid.
-        model.add_point(collect_result(mod_pars, model,
-                                       output_path, hybrid_basis,
-                                       args.run_pdfas_uncerts))
+        _init_worker(*worker_args)
+        for mod_pars in points:
+            _run_model_point(mod_pars)
+        model.set_results(_RESULTS)
     # Write grid of points to root file
     model.write_to_root()
     return
@@ -1,5 +1,8 @@
 #!/usr/bin/env python
 
+import ast
+import functools
+import itertools
 import logging
 import math
 
@@ -12,60 +15,57 @@ ROOT.gROOT.SetBatch()
 logger = logging.getLogger(__name__)
 
 
+# Quantities stored for every model point
+_POINT_QUANTITIES = [
+        "model_validity",
+        "has_valid_params",
+        "unitarity",
+        "perturbativity",
+        "stability",
+        "cos_betal",
+        "sin_betal",
+        ]
+# Quantities stored for each Higgs boson of a model point
+_BOSON_QUANTITIES = [
+        "m_{}",
+        "xs_gg{}",
+        "xs_bb{}",
+        "br_{}tautau",
+        "xs_gg{}_scale_down",
+        "xs_gg{}_scale_up",
+        "gt_{}",
+        "gb_{}",
+        ]
+_PDFAS_QUANTITIES = [
+        "xs_gg{}_pdfas_down",
+        "xs_gg{}_pdfas_up",
+        "xs_bb{}_pdfas_down",
+        "xs_bb{}_pdfas_up",
+        ]
+# Names of the written histograms differing from the quantity
+_HIST_NAMES = {
+        "cos_betal": "cos(beta-alpha)",
+        "sin_betal": "sin(beta-alpha)",
+        }
+
+
 class HiggsProperties(object):
 
+    __slots__ = ("name", "mass", "gg_xs", "bb_xs", "br_tautau", "gt", "gb",
+                 "_gg_xs_scale_unc", "_gg_xs_pdfas_unc", "_bb_xs_pdfas_unc")
+
     def __init__(self, name):
-        self._name = name
-        self._mass = 0.
-        self._gg_xs = 0.
-        self._bb_xs = 0.
-        self._br_tautau = 0.
+        self.name = name
+        self.mass = 0.
+        self.gg_xs = 0.
+        self.bb_xs = 0.
+        self.br_tautau = 0.
+        self.gt = 0
+        self.gb = 0
         self._gg_xs_scale_unc = (0., 0.)
-        self._yukawa_t = 0
-        self._yukawa_b = 0
         self._gg_xs_pdfas_unc = (0., 0.)
         self._bb_xs_pdfas_unc = (0., 0.)
 
-    @property
-    def name(self):
-        return self._name
-
-    @name.setter
-    def name(self, name):
-        self._name = name
-
-    @property
-    def mass(self):
-        return self._mass
-
-    @mass.setter
-    def mass(self, mass):
-        self._mass = mass
-
-    @property
-    def gg_xs(self):
-        return self._gg_xs
-
-    @gg_xs.setter
-    def gg_xs(self, xsec):
-        self._gg_xs = xsec
-
-    @property
-    def bb_xs(self):
-        return self._bb_xs
-
-    @bb_xs.setter
-    def bb_xs(self, xsec):
-        self._bb_xs = xsec
-
-    @property
-    def br_tautau(self):
-        return self._br_tautau
-
-    @br_tautau.setter
-    def br_tautau(self, br):
-        self._br_tautau = br
-
     @property
     def gg_xs_scale_unc(self):
         return self._gg_xs_scale_unc
@@ -76,22 +76,6 @@ class HiggsProperties(object):
             raise ValueError("Uncertainty on gg{} xsec must be given as tuple.".format(self.name))  # noqa: E501
         self._gg_xs_scale_unc = unc
 
-    @property
-    def gt(self):
-        return self._yukawa_t
-
-    @gt.setter
-    def gt(self, yukawa):
-        self._yukawa_t = yukawa
-
-    @property
-    def gb(self):
-        return self._yukawa_b
-
-    @gb.setter
-    def gb(self, yukawa):
-        self._yukawa_b = yukawa
-
     @property
     def gg_xs_pdfas_unc(self):
         return self._gg_xs_pdfas_unc
@@ -115,6 +99,11 @@ class HiggsProperties(object):
 
 class THDMPoint(object):
 
+    __slots__ = ("parameter_names", "parameter_point",
+                 "is_valid_model", "has_valid_params", "unitarity",
+                 "perturbativity", "stability",
+                 "h", "H", "A", "_cos_betal", "_sin_betal")
+
     def __init__(self, par_names, par_values,
                  h=None, H=None, A=None):
         """Create class scoring Benchmark Parameter point.
@@ -129,79 +118,15 @@ class THDMPoint(object):
                              "specified")
         self.parameter_names = par_names
         self.parameter_point = par_values
-        self._is_valid_model = False
-        self._has_valid_params = False
-        self._unitarity = False
-        self._perturbativity = False
-        self._stability = False
-        self._h = h
-        self._H = H
-        self._A = A
-        self._cos_betal = 0.
-
-    @property
-    def is_valid_model(self):
-        return self._is_valid_model
-
-    @is_valid_model.setter
-    def is_valid_model(self, model_valid):
-        self._is_valid_model = model_valid
-
-    @property
-    def has_valid_params(self):
-        return self._has_valid_params
-
-    @has_valid_params.setter
-    def has_valid_params(self, params_valid):
-        self._has_valid_params = params_valid
-
-    @property
-    def unitarity(self):
-        return self._unitarity
-
-    @unitarity.setter
-    def unitarity(self, unitarity):
-        self._unitarity = unitarity
-
-    @property
-    def perturbativity(self):
-        return self._perturbativity
-
-    @perturbativity.setter
-    def perturbativity(self, perturbativity):
-        self._perturbativity = perturbativity
-
-    @property
-    def stability(self):
-        return self._stability
-
-    @stability.setter
-    def stability(self, stability):
-        self._stability = stability
-
-    @property
-    def h(self):
-        return self._h
-
-    @h.setter
-    def h(self, h_prop):
-        self._h = h_prop
-
-    @property
-    def H(self):
-        return self._H
-
-    @H.setter
-    def H(self, H_prop):
-        self._H = H_prop
-
-    @property
-    def A(self):
-        return self._A
-
-    @A.setter
-    def A(self, A_prop):
-        self._A = A_prop
+        self.is_valid_model = False
+        self.has_valid_params = False
+        self.unitarity = False
+        self.perturbativity = False
+        self.stability = False
+        self.h = h
+        self.H = H
+        self.A = A
+        self.cos_betal = 0.
 
     @property
     def cos_betal(self):
@@ -214,10 +139,11 @@ class THDMPoint(object):
         # translate to sin(beta-alpha) here.
         # sin(beta-alpha) should not be set but only retrieved.
         self._cos_betal = cos_betal
+        self._sin_betal = math.sin(math.acos(cos_betal))
 
     @property
     def sin_betal(self):
-        return math.sin(math.acos(self._cos_betal))
+        return self._sin_betal
 
     @sin_betal.setter
     def sin_betal(self, sin_betal):
@@ -233,8 +159,15 @@ class THDMModel(object):
         if len(scan_pars.keys()) != 2:
             raise ValueError("Too few or too less scan parameters given")
         self._scan_parameters = scan_pars
+        self._first_parameter = next(iter(scan_pars))
+        # Values of the scan parameters only depend on the inputs
+        self._param_ranges = {par: self._get_param_range(par)
+                              for par in scan_pars}
         self._model_parameters = model_pars
-        self._model_points = []
+        # Binning of the result grid only depends on the inputs
+        self._binning = self._derive_binning()
+        # Values of the added points are stored directly in the result grid
+        self._results = None
         self._pdfas_unc = include_pdfas_unc
 
     @property
@@ -252,12 +185,109 @@ class THDMModel(object):
 
     def parameter_points(self):
         par_1, par_2 = self._scan_parameters.keys()
-        for x in self._get_param_range(par_1):
-            for y in self._get_param_range(par_2):
-                yield ((par_1, x), (par_2, y))
+        return itertools.product(
+                zip(itertools.repeat(par_1), self._param_ranges[par_1]),
+                zip(itertools.repeat(par_2), self._param_ranges[par_2]))
 
     def add_point(self, point):
-        self._model_points.append(point)
+        if self._results is None:
+            self._results = np.zeros(self.grid_shape, dtype=np.float64)
+        self._results[self.bin_index(point)] = self.point_values(point)
+
+    def clear_points(self):
+        self._results = None
+
+    @property
+    def quantities(self):
+        """Names of the quantities stored per model point in the result grid"""
+        quantities = list(_POINT_QUANTITIES)
+        for boson in ["h", "H", "A"]:
+            quant_list = list(_BOSON_QUANTITIES)
+            if self._pdfas_unc:
+                quant_list.extend(_PDFAS_QUANTITIES)
+            quantities.extend(quant.format(boson) for quant in quant_list)
+        return quantities
+
+    @property
+    def grid_shape(self):
+        """Shape of the result grid.
+
+        The grid follows the bin layout of the written histograms,
+        including the under- and overflow bins, with the values of the
+        quantities stored along the last axis.
+        """
+        (_, _, xbins), (_, _, ybins) = self._binning
+        return (ybins + 2, xbins + 2, len(self.quantities))
+
+    @staticmethod
+    def _find_bin(value, low, up, nbins):
+        # Same bin lookup as done by ROOT for equidistant binning, values
+        # outside of the axis range end up in the under- and overflow bins
+        ibin = math.floor(nbins * (value - low) / (up - low)) + 1
+        return min(max(ibin, 0), nbins + 1)
+
+    def _point_coordinates(self, point):
+        # Coordinates in the order of the histogram axes (par_1, par_2)
+        if point.parameter_names[0] == self._first_parameter:
+            return point.parameter_point
+        return point.parameter_point[::-1]
+
+    def bin_index(self, point):
+        """Index of the model point in the result grid"""
+        x_val, y_val = self._point_coordinates(point)
+        (xlow, xup, xbins), (ylow, yup, ybins) = self._binning
+        return (self._find_bin(y_val, ylow, yup, ybins),
+                self._find_bin(x_val, xlow, xup, xbins))
+
+    def point_values(self, point):
+        """Values of the quantities of a model point in the result grid"""
+        values = [
+                point.is_valid_model,
+                point.has_valid_params,
+                point.unitarity,
+                point.perturbativity,
+                point.stability,
+                point.cos_betal,
+                point.sin_betal,
+                ]
+        for props in (point.h, point.H, point.A):
+            values.extend([
+                props.mass,
+                props.gg_xs,
+                props.bb_xs,
+                props.br_tautau,
+                props.gg_xs_scale_unc[0],
+                props.gg_xs_scale_unc[1],
+                props.gt,
+                props.gb,
+                ])
+            if self._pdfas_unc:
+                values.extend([
+                    props.gg_xs_pdfas_unc[0],
+                    props.gg_xs_pdfas_unc[1],
+                    props.bb_xs_pdfas_unc[0],
+                    props.bb_xs_pdfas_unc[1],
+                    ])
+        return values
+
+    def set_results(self, results):
+        """Replace the result grid of the model
+
+        @param: results
+            Array with the shape given by grid_shape, e.g. filled by
+            several processes via shared memory.
+        """
+        if results.shape != self.grid_shape:
+            raise ValueError("Result grid of shape {} does not match "
+                             "the expected shape {}".format(
+                                 results.shape, self.grid_shape))
+        self._results = results
+
+    def results(self):
+        """Return the result grid of the model"""
+        if self._results is None:
+            return np.zeros(self.grid_shape, dtype=np.float64)
+        return self._results
 
     def _derive_binning(self):
         # Determine binning
@@ -287,125 +317,119 @@ class THDMModel(object):
         # TODO: Different calculation of binning will allow
         #       running with non-equidistant binning
         # Create histograms for each quantity to be written
-        (xlow, xup, xbins), (ylow, yup, ybins) = self._derive_binning()
-        hists = {}
-        for boson in ["h", "H", "A"]:
-            quant_list = [
-                    "m_{}",
-                    "xs_gg{}",
-                    "xs_bb{}",
-                    "br_{}tautau",
-                    "xs_gg{}_scale_down",
-                    "xs_gg{}_scale_up",
-                    "gt_{}",
-                    "gb_{}",
-                    ]
-            if self._pdfas_unc:
-                quant_list.extend([
-                    "xs_gg{}_pdfas_down",
-                    "xs_gg{}_pdfas_up",
-                    "xs_bb{}_pdfas_down",
-                    "xs_bb{}_pdfas_up",
-                ])
-            for quant in map(lambda x: x.format(boson),
-                             quant_list):
-                quant_exp = "{}".format(quant)
-                hists[quant_exp] = ROOT.TH2D(quant_exp,
-                                             quant_exp,
-                                             xbins,
-                                             xlow,
-                                             xup,
-                                             ybins,
-                                             ylow,
-                                             yup)
-        for qual in ["model_validity",
-                     "has_valid_params",
-                     "unitarity",
-                     "perturbativity",
-                     "stability"]:
-            hists[qual] = ROOT.TH2D(qual,
-                                    qual,
-                                    xbins,
-                                    xlow,
-                                    xup,
-                                    ybins,
-                                    ylow,
-                                    yup)
-        hists["cos_betal"] = ROOT.TH2D("cos(beta-alpha)",
-                                       "cos(beta-alpha)",
-                                       xbins,
-                                       xlow,
-                                       xup,
-                                       ybins,
-                                       ylow,
-                                       yup)
-        hists["sin_betal"] = ROOT.TH2D("sin(beta-alpha)",
-                                       "sin(beta-alpha)",
-                                       xbins,
-                                       xlow,
-                                       xup,
-                                       ybins,
-                                       ylow,
-                                       yup)
-        # Fill the histograms per model point
-        par_1, par_2 = self._scan_parameters.keys()
-        for point in self._model_points:
-            x_val, y_val = (point.parameter_point
-                            if point.parameter_names[0] == par_1
-                            else reversed(point.parameter_point))
-            hists["model_validity"].Fill(x_val, y_val, point.is_valid_model)
-            hists["has_valid_params"].Fill(x_val, y_val, point.has_valid_params)
-            hists["unitarity"].Fill(x_val, y_val, point.unitarity)
-            hists["perturbativity"].Fill(x_val, y_val, point.perturbativity)
-            hists["stability"].Fill(x_val, y_val, point.stability)
-            hists["cos_betal"].Fill(x_val, y_val, point.cos_betal)
-            hists["sin_betal"].Fill(x_val, y_val, point.sin_betal)
-            for boson in ["h", "H", "A"]:
-                hists["m_{}".format(boson)].Fill(x_val, y_val,
-                                                 getattr(point, boson).mass)
-                hists["xs_gg{}".format(boson)].Fill(
-                        x_val, y_val,
-                        getattr(point, boson).gg_xs)
-                hists["xs_bb{}".format(boson)].Fill(
-                        x_val, y_val,
-                        getattr(point, boson).bb_xs)
-                hists["br_{}tautau".format(boson)].Fill(
-                        x_val, y_val,
-                        getattr(point, boson).br_tautau)
-                hists["xs_gg{}_scale_down".format(boson)].Fill(
-                        x_val, y_val,
-                        getattr(point, boson).gg_xs_scale_unc[0])
-                hists["xs_gg{}_scale_up".format(boson)].Fill(
-                        x_val, y_val,
-                        getattr(point, boson).gg_xs_scale_unc[1])
-                hists["gt_{}".format(boson)].Fill(
-                        x_val, y_val,
-                        getattr(point, boson).gt)
-                hists["gb_{}".format(boson)].Fill(
-                        x_val, y_val,
-                        getattr(point, boson).gb)
-                if self._pdfas_unc:
-                    print("Filling histograms for uncertainties")
-                    hists["xs_gg{}_pdfas_down".format(boson)].Fill(
-                            x_val, y_val,
-                            getattr(point, boson).gg_xs_pdfas_unc[0])
-                    hists["xs_gg{}_pdfas_up".format(boson)].Fill(
-                            x_val, y_val,
-                            getattr(point, boson).gg_xs_pdfas_unc[1])
-                    hists["xs_bb{}_pdfas_down".format(boson)].Fill(
-                            x_val, y_val,
-                            getattr(point, boson).bb_xs_pdfas_unc[0])
-                    hists["xs_bb{}_pdfas_up".format(boson)].Fill(
-                            x_val, y_val,
-                            getattr(point, boson).bb_xs_pdfas_unc[1])
+        (xlow, xup, xbins), (ylow, yup, ybins) = self._binning
+
+        def create_hist(name):
+            hist = ROOT.TH2D(name, name, xbins, xlow, xup, ybins, ylow, yup)
+            # The histograms are not owned by the output file but written
+            # explicitly once they are filled
+            hist.SetDirectory(0)
+            return hist
+        quantities = self.quantities
+        hists = {quant: create_hist(_HIST_NAMES.get(quant, quant))
+                 for quant in quantities}
+        # Fill the histograms from the result grid
+        results = self.results()
+        if self._pdfas_unc:
+            logger.info("Filling histograms for uncertainties")
+        for iq, quant in enumerate(quantities):
+            # The grid follows the bin layout of ROOT, so the content of
+            # all bins can be set in a single call.
+            hists[quant].SetContent(np.ascontiguousarray(results[:, :, iq]))
 
         # Write and close the root file
-        output.Write()
+        output.cd()
+        for hist in hists.values():
+            hist.Write()
         output.Close()
 
 
+# Syntax allowed in parameter expressions given as strings
+_EXPRESSION_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant,
+                     ast.Name, ast.Load, ast.operator, ast.unaryop,
+                     ast.Call, ast.Attribute)
+# Functions and constants of the math module usable in expressions,
+# either directly like "pi/2" or via the module like "math.cos(x)"
+_MATH_NAMES = {name: getattr(math, name)
+               for name in dir(math) if not name.startswith("_")}
+_MATH_NAMES["math"] = math
+
+
+def _is_math_attribute(node):
+    return (isinstance(node.value, ast.Name) and node.value.id == "math"
+            and node.attr in _MATH_NAMES)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_expression(expr):
+    tree = ast.parse(expr, mode="eval")
+    names = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _EXPRESSION_NODES):
+            raise ValueError("Unsupported syntax {} in parameter "
+                             "expression {}".format(type(node).__name__,
+                                                    expr))
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            if not _is_math_attribute(node):
+                raise ValueError("Only functions and constants of the math "
+                                 "module can be accessed in parameter "
+                                 "expression {}".format(expr))
+        elif isinstance(node, ast.Call):
+            # Only functions of the math module can be called
+            if not (isinstance(node.func, ast.Attribute)
+                    or (isinstance(node.func, ast.Name)
+                        and node.func.id in _MATH_NAMES)):
+                raise ValueError("Only functions of the math module can be "
+                                 "called in parameter expression {}".format(
+                                     expr))
+    return compile(tree, "<parameter expression>", "eval"), frozenset(names)
+
+
+def _evaluate(value, **variables):
+    """Evaluate parameter values given as arithmetic expressions
+
+    @param: value
+        Parameter value, strings like "mH + 100." or "math.cos(pi/3)" are
+        evaluated using the given variables and the math module
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        code, names = _compile_expression(value)
+        unknown = names.difference(variables, _MATH_NAMES)
+        if unknown:
+            raise ValueError("Unknown names {} in parameter expression "
+                             "{}".format(sorted(unknown), value))
+        namespace = dict(_MATH_NAMES, __builtins__={})
+        namespace.update(variables)
+        return eval(code, namespace)
+
+
+def _convert_sin_betal(cos_betal):
+    # Assume that we always want to convert to the
+    # SusHi and 2HDMC convention for values of beta-alpha
+    # Add correct rescaling of angles, transformation of
+    # conventions taken from https://sushi.hepforge.org/manual.html
+    # 0 <= (beta-alpha)_B <= pi/2: no conversion of angle necessary
+    # (beta-alpha)_B > pi/2: (beta-alpha)_B = (beta-alpha)_A - pi
+    betal = math.acos(cos_betal)
+    if betal > math.pi/2:
+        betal -= math.pi
+    return math.sin(betal)
+
+
 class THDMInput(object):
 
+    __slots__ = ("mh", "mH", "_cos_betal", "_sin_betal", "Z4", "Z5", "Z7",
+                 "tanb", "type")
+
+    # Inputs are given in the hybrid basis
+    hybrid_basis = True
+
     def __init__(self,
                  mh=125.,
                  mH=200.,
@@ -415,33 +439,15 @@ class THDMInput(object):
                  Z7=0.,
                  tanb=5.,
                  thdm_type=2):
-        self._mh = mh
-        self._mH = mH
-        if isinstance(cos_betal, str):
-            self._cos_betal = eval(cos_betal)
-        else:
-            self._cos_betal = cos_betal
-        self._Z4 = Z4
-        self._Z5 = Z5
-        self._Z7 = Z7
-        self._tanb = tanb
-        self._type = thdm_type
-
-    @property
-    def mh(self):
-        return self._mh
-
-    @mh.setter
-    def mh(self, mh):
-        self._mh = mh
-
-    @property
-    def mH(self):
-        return self._mH
-
-    @mH.setter
-    def mH(self, mH):
-        self._mH = mH
+        self.mh = mh
+        self.mH = mH
+        self.cos_betal = _evaluate(cos_betal, mh=mh, mH=mH, Z4=Z4, Z5=Z5,
+                                   Z7=Z7, tanb=tanb, thdm_type=thdm_type)
+        self.Z4 = Z4
+        self.Z5 = Z5
+        self.Z7 = Z7
+        self.tanb = tanb
+        self.type = thdm_type
 
     @property
     def cos_betal(self):
@@ -450,63 +456,20 @@ class THDMInput(object):
     @cos_betal.setter
     def cos_betal(self, cos_betal):
         self._cos_betal = cos_betal
+        self._sin_betal = _convert_sin_betal(cos_betal)
 
     @property
     def sin_betal(self):
-        # Assume that we always want to convert to the
-        # SusHi and 2HDMC convention for values of beta-alpha
-        # Add correct rescaling of angles, transformation of
-        # conventions taken from https://sushi.hepforge.org/manual.html
-        # 0 <= (beta-alpha)_B <= pi/2: no conversion of angle necessary
-        # (beta-alpha)_B > pi/2: (beta-alpha)_B = (beta-alpha)_A - pi
-        betal = math.acos(self._cos_betal)
-        if betal > math.pi/2:
-            betal -= math.pi
-        sin_betal = math.sin(betal)
-        return sin_betal
+        return self._sin_betal
 
-    @property
-    def Z4(self):
-        return self._Z4
-
-    @Z4.setter
-    def Z4(self, Z4):
-        self._Z4 = Z4
-
-    @property
-    def Z5(self):
-        return self._Z5
-
-    @Z5.setter
-    def Z5(self, Z5):
-        self._Z5 = Z5
-
-    @property
-    def Z7(self):
-        return self._Z7
-
-    @Z7.setter
-    def Z7(self, Z7):
-        self._Z7 = Z7
 
-    @property
-    def tanb(self):
-        return self._tanb
-
-    @tanb.setter
-    def tanb(self, tanb):
-        self._tanb = tanb
-
-    @property
-    def type(self):
-        return self._type
-
-    @type.setter
-    def type(self, thdm_type):
-        self._type = thdm_type
+class THDMPhysicsInput(object):
 
+    __slots__ = ("mh", "mH", "mA", "mHp", "_cos_betal", "_sin_betal",
+                 "lambda6", "lambda7", "tanb", "type", "m12_square")
 
-class THDMPhysicsInput(object):
+    # Inputs are given in the physical basis
+    hybrid_basis = False
 
     def __init__(self,
                  mh=125.,
@@ -521,78 +484,40 @@ class THDMPhysicsInput(object):
                  thdm_type=2):
         # TODO: For now calculate m12_square hard coded
         # here
-        self._mh = mh
-        self._mH = mH
-        if isinstance(mA, str):
-            self._mA = eval(mA)
-        else:
-            self._mA = mA
-        mA = self.mA
-        if isinstance(mHp, str):
-            self._mHp = eval(mHp)
-        else:
-            self._mHp = mHp
-        if isinstance(cos_betal, str):
-            self._cos_betal = eval(cos_betal)
-        else:
-            self._cos_betal = cos_betal
-        self._lambda6 = lambda6
-        self._lambda7 = lambda7
-        self._tanb = tanb
-        tanb = self._tanb
-        self._type = thdm_type
+        self.mh = mh
+        self.mH = mH
+        # Expressions can use the other parameters, the masses are
+        # evaluated first
+        parameters = dict(mh=mh, mH=mH, lambda6=lambda6, lambda7=lambda7,
+                          tanb=tanb, thdm_type=thdm_type)
+        self.mA = parameters["mA"] = _evaluate(mA, **parameters)
+        self.mHp = parameters["mHp"] = _evaluate(mHp, **parameters)
+        self.cos_betal = parameters["cos_betal"] = _evaluate(cos_betal,
+                                                             **parameters)
+        self.lambda6 = lambda6
+        self.lambda7 = lambda7
+        self.tanb = tanb
+        self.type = thdm_type
         # Calculate m12_square from the given values
         if m12_square is None:
-            Z5 = self._mH**2 * (1 - self._cos_betal**2) \
-                 + mh**2 * self._cos_betal**2 \
-                 - self._mA**2
-            Z6 = (mh**2 - self._mH**2) \
-                  * self._cos_betal*math.sin(math.acos(self._cos_betal))
-            lambda5 = Z5 + 0.5 * Z6 * math.tan(2 * math.atan(tanb))
+            beta = math.atan(tanb)
+            sin_betal = math.sin(math.acos(self.cos_betal))
+            Z5 = self.mH**2 * (1 - self.cos_betal**2) \
+                 + mh**2 * self.cos_betal**2 \
+                 - self.mA**2
+            Z6 = (mh**2 - self.mH**2) \
+                  * self.cos_betal*sin_betal
+            lambda5 = Z5 + 0.5 * Z6 * math.tan(2 * beta)
             logger.debug("Parameters in physical basis:")
-            logger.debug("Z5: ", Z5)
-            logger.debug("Z6: ", Z6)
-            logger.debug("lamda5: ", lambda5)
-            logger.debug("beta: ", math.atan(tanb))
-            logger.debug("sin(beta-alpha): ", math.sin(math.acos(self._cos_betal)))
-            self._m12_square = max(1-1./(tanb**2), 0) \
-                                * 0.5 * math.sin(2 * math.atan(tanb))*(self._mA**2 + lambda5)
-        elif isinstance(m12_square, str):
-            self._m12_square = eval(m12_square)
+            logger.debug("Z5: %s", Z5)
+            logger.debug("Z6: %s", Z6)
+            logger.debug("lamda5: %s", lambda5)
+            logger.debug("beta: %s", beta)
+            logger.debug("sin(beta-alpha): %s", sin_betal)
+            self.m12_square = max(1-1./(tanb**2), 0) \
+                                * 0.5 * math.sin(2 * beta)*(self.mA**2 + lambda5)
         else:
-            self._m12_square = m12_square
-
-    @property
-    def mh(self):
-        return self._mh
-
-    @mh.setter
-    def mh(self, mh):
-        self._mh = mh
-
-    @property
-    def mH(self):
-        return self._mH
-
-    @mH.setter
-    def mH(self, mH):
-        self._mH = mH
-
-    @property
-    def mA(self):
-        return self._mA
-
-    @mA.setter
-    def mA(self, mA):
-        self._mA = mA
-
-    @property
-    def mHp(self):
-        return self._mHp
-
-    @mHp.setter
-    def mHp(self, mHp):
-        self._mHp = mHp
+            self.m12_square = _evaluate(m12_square, **parameters)
 
     @property
     def cos_betal(self):
@@ -601,20 +526,11 @@ class THDMPhysicsInput(object):
     @cos_betal.setter
     def cos_betal(self, cos_betal):
         self._cos_betal = cos_betal
+        self._sin_betal = _convert_sin_betal(cos_betal)
 
     @property
     def sin_betal(self):
-        # Assume that we always want to convert to the
-        # SusHi and 2HDMC convention for values of beta-alpha
-        # Add correct rescaling of angles, transformation of
-        # conventions taken from https://sushi.hepforge.org/manual.html
-        # 0 <= (beta-alpha)_B <= pi/2: no conversion of angle necessary
-        # (beta-alpha)_B > pi/2: (beta-alpha)_B = (beta-alpha)_A - pi
-        betal = math.acos(self._cos_betal)
-        if betal > math.pi/2:
-            betal -= math.pi
-        sin_betal = math.sin(betal)
-        return sin_betal
+        return self._sin_betal
 
     @sin_betal.setter
     def sin_betal(self, sin_betal):
@@ -623,44 +539,4 @@ class THDMPhysicsInput(object):
         betal = math.asin(sin_betal)
         if betal < 0:
             betal = betal + math.pi
-        self._cos_betal = math.cos(betal)
-
-    @property
-    def lambda6(self):
-        return self._lambda6
-
-    @lambda6.setter
-    def lambda6(self, lambda6):
-        self._lambda6 = lambda6
-
-    @property
-    def lambda7(self):
-        return self._lambda7
-
-    @lambda7.setter
-    def lambda7(self, lambda7):
-        self._lambda7 = lambda7
-
-    @property
-    def tanb(self):
-        return self._tanb
-
-    @tanb.setter
-    def tanb(self, tanb):
-        self._tanb = tanb
-
-    @property
-    def type(self):
-        return self._type
-
-    @type.setter
-    def type(self, thdm_type):
-        self._type = thdm_type
-
-    @property
-    def m12_square(self):
-        return self._m12_square
-
-    @m12_square.setter
-    def m12_square(self, m12_square):
-        self._m12_square = m12_square
+        self.cos_betal = math.cos(betal)
@@ -16,8 +16,7 @@ import thdm_scanner.lha_utils as lha_utils
 logger = logging.getLogger(__name__)
 
 
-class THDMHarvesterABC(object):
-    __metaclass__ = ABCMeta
+class THDMHarvesterABC(metaclass=ABCMeta):
 
     def __init__(self):
         pass
@@ -36,20 +35,19 @@ class THDMCHarvester(THDMHarvesterABC):
 
     def __init__(self, outpath="output",
                  scan_parameters=("mH", "tanb")):
-        self._outputfile = os.path.join(outpath, "2HDMC_output.out")
+        # Name of the output file to be filled with the scan point
+        self._outputfile = os.path.join(
+                outpath,
+                "2HDMC_output.{}.{{}}.{}.{{}}.out".format(*scan_parameters))
         self._scan_params = scan_parameters
 
     def set_inputs(self, inputs):
         self._input = inputs
 
     def harvest_output(self, model_point):
-        outname = self._outputfile.replace(".out", ".{}.{}.{}.{}.out".format(
-            self._scan_params[0],
-            getattr(self._input, self._scan_params[0]),
-            self._scan_params[1],
-            getattr(self._input, self._scan_params[1])
-            )
-        )
+        outname = self._outputfile.format(
+                getattr(self._input, self._scan_params[0]),
+                getattr(self._input, self._scan_params[1]))
         outfile = lha_utils.THDMCOutput(outname)
         model_point.is_valid_model = outfile.valid_model
         model_point.has_valid_params = outfile.valid_params
@@ -72,20 +70,23 @@ class THDMCHarvester(THDMHarvesterABC):
         # input parameters
         beta = math.atan(self._input.tanb)  # atan return range: -pi/2(0), pi/2
         alpha = beta - math.acos(self._input.cos_betal)  # acos ret.r: 0, pi
+        sin_alpha, cos_alpha = math.sin(alpha), math.cos(alpha)
+        sin_beta, cos_beta = math.sin(beta), math.cos(beta)
+        tan_beta = math.tan(beta)
         if self._input.type == 1:
-            h.gt = math.cos(alpha) / math.sin(beta)
-            h.gb = math.cos(alpha) / math.sin(beta)
-            H.gt = math.sin(alpha) / math.sin(beta)
-            H.gb = math.sin(alpha) / math.sin(beta)
-            A.gt = -1. / math.tan(beta)
-            A.gb = 1. / math.tan(beta)
+            h.gt = cos_alpha / sin_beta
+            h.gb = cos_alpha / sin_beta
+            H.gt = sin_alpha / sin_beta
+            H.gb = sin_alpha / sin_beta
+            A.gt = -1. / tan_beta
+            A.gb = 1. / tan_beta
         else:
-            h.gt = math.cos(alpha) / math.sin(beta)
-            h.gb = -math.sin(alpha) / math.cos(beta)
-            H.gt = math.sin(alpha) / math.sin(beta)
-            H.gb = math.cos(alpha) / math.cos(beta)
-            A.gt = -1. / math.tan(beta)
-            A.gb = -math.tan(beta)
+            h.gt = cos_alpha / sin_beta
+            h.gb = -sin_alpha / cos_beta
+            H.gt = sin_alpha / sin_beta
+            H.gb = cos_alpha / cos_beta
+            A.gt = -1. / tan_beta
+            A.gb = -tan_beta
         # Add the correct Higgs properties to the model point
         model_point.h = h
         model_point.H = H
@@ -98,7 +99,11 @@ class SusHiHarvester(THDMHarvesterABC):
     def __init__(self, outpath="output",
                  scan_parameters=("mH", "tanb"),
                  run_pdf_uncerts=False):
-        self._outputfile = os.path.join(outpath, "SusHi.out")
+        # Name of the output files to be filled with the scan point,
+        # the Higgs boson and the pdf member
+        self._outputfile = os.path.join(
+                outpath,
+                "SusHi.{}.{{}}.{}.{{}}.H{{}}{{}}.out".format(*scan_parameters))
         self._scan_params = scan_parameters
         self._run_uncerts = run_pdf_uncerts
 
@@ -111,67 +116,53 @@ class SusHiHarvester(THDMHarvesterABC):
                 12: "H",
                 21: "A"
         }
+        point = (getattr(self._input, self._scan_params[0]),
+                 getattr(self._input, self._scan_params[1]))
         for higgs in [11, 12, 21]:
             outfile = lha_utils.SusHiOutput(
-                    self._outputfile.replace(".out",
-                                             ".{}.{}.{}.{}.H{}.out".format(
-                                                 self._scan_params[0],
-                                                 getattr(self._input,
-                                                         self._scan_params[0]),
-                                                 self._scan_params[1],
-                                                 getattr(self._input,
-                                                         self._scan_params[1]),
-                                                 higgs)))
-            getattr(model_point, higgs_dict[higgs]).gg_xs = outfile.xs_ggPhi
-            getattr(model_point, higgs_dict[higgs]).bb_xs = outfile.xs_bbPhi
-            getattr(model_point, higgs_dict[higgs]).bb_xs = outfile.xs_bbPhi
-            getattr(model_point, higgs_dict[higgs]).gg_xs_scale_unc = (outfile.xs_ggPhi_scale_down, outfile.xs_ggPhi_scale_up)  # noqa: E501
+                    self._outputfile.format(*point, higgs, ""))
+            higgs_props = getattr(model_point, higgs_dict[higgs])
+            higgs_props.gg_xs = outfile.xs_ggPhi
+            higgs_props.bb_xs = outfile.xs_bbPhi
+            higgs_props.gg_xs_scale_unc = (outfile.xs_ggPhi_scale_down, outfile.xs_ggPhi_scale_up)  # noqa: E501
             # Check mass of considered Higgs boson between SusHi and 2HDMC
             # as cross check.
-            if outfile.mPhi != getattr(model_point, higgs_dict[higgs]).mass:
+            if outfile.mPhi != higgs_props.mass:
                 raise RuntimeError("Mass calculated from SusHi and 2HDMC "
                                    "does not agree. "
                                    "Values are {} and {}".format(
                                        outfile.mPhi,
-                                       getattr(model_point,
-                                               higgs_dict[higgs]).mass))
+                                       higgs_props.mass))
             # Read pdf and alpha_s uncertainties if requested
             if self._run_uncerts:
                 # Collect all calculated cross sections for pdf and
                 # alpha_s variations.
-                ggPhi_xsections = []
-                bbPhi_xsections = []
-                for pdf_member in range(1, 103):
-                    outname = self._outputfile.replace(".out",
-                                                       ".{}.{}.{}.{}.H{}.pdf{}.out".format(
-                                                           self._scan_params[0],
-                                                           getattr(self._input,
-                                                                   self._scan_params[0]),
-                                                           self._scan_params[1],
-                                                           getattr(self._input,
-                                                                   self._scan_params[1]),
-                                                           higgs,
-                                                           pdf_member))
+                ggPhi_xsections = np.empty(102)
+                bbPhi_xsections = np.empty(102)
+                for i, pdf_member in enumerate(range(1, 103)):
+                    outname = self._outputfile.format(
+                            *point, higgs, ".pdf{}".format(pdf_member))
                     outfile = lha_utils.SusHiOutput(outname)
-                    ggPhi_xsections.append(outfile.xs_ggPhi)
-                    bbPhi_xsections.append(outfile.xs_bbPhi)
+                    ggPhi_xsections[i] = outfile.xs_ggPhi
+                    bbPhi_xsections[i] = outfile.xs_bbPhi
                 # Calculate the uncertainties from the collected values
                 # For the pdf uncertainties there are two different
                 # possibilieties to calculate the uncertainties (arXiv:)
                 # Possibility 1:
-                pdf_unc = np.std(ggPhi_xsections[:-2], ddof=1)
-                pdf_unc_bbPhi = np.std(bbPhi_xsections[:-2], ddof=1)
+                pdf_unc = ggPhi_xsections[:-2].std(ddof=1)
+                pdf_unc_bbPhi = bbPhi_xsections[:-2].std(ddof=1)
                 # Possibility 2 (asymmetric non-Gaussian case):
-                # sorted_pdf_uncs = sorted(ggPhi_xsections[:-2])
-                # pdf_unc = (sorted_pdf_uncs[83]-sorted_pdf_uncs[15]) / 2.
-                # sorted_pdf_uncs = sorted(bbPhi_xsections[:-2])
-                # pdf_unc_bbPhi = (sorted_pdf_uncs[83]-sorted_pdf_uncs[15]) / 2.
+                # (only the two quantiles are needed, no full sort)
+                # lo, hi = np.partition(ggPhi_xsections[:-2], (15, 83))[[15, 83]]
+                # pdf_unc = (hi - lo) / 2.
+                # lo, hi = np.partition(bbPhi_xsections[:-2], (15, 83))[[15, 83]]
+                # pdf_unc_bbPhi = (hi - lo) / 2.
 
                 # Calculate alpha_s uncertainty from remaining variations
                 alphas_unc = (ggPhi_xsections[-1] - ggPhi_xsections[-2]) / 2.
-                pdf_as_unc = math.sqrt(pdf_unc**2 + alphas_unc**2)
-                getattr(model_point, higgs_dict[higgs]).gg_xs_pdfas_unc = (-pdf_as_unc, pdf_as_unc)
+                pdf_as_unc = math.hypot(pdf_unc, alphas_unc)
+                higgs_props.gg_xs_pdfas_unc = (-pdf_as_unc, pdf_as_unc)
                 alphas_unc_bbPhi = (bbPhi_xsections[-1] - bbPhi_xsections[-2]) / 2.
-                pdf_as_unc_bbPhi = math.sqrt(pdf_unc_bbPhi**2 + alphas_unc_bbPhi**2)
-                getattr(model_point, higgs_dict[higgs]).bb_xs_pdfas_unc = (-pdf_as_unc_bbPhi, pdf_as_unc_bbPhi)
+                pdf_as_unc_bbPhi = math.hypot(pdf_unc_bbPhi, alphas_unc_bbPhi)
+                higgs_props.bb_xs_pdfas_unc = (-pdf_as_unc_bbPhi, pdf_as_unc_bbPhi)
         return
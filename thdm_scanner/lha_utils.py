@@ -1,17 +1,26 @@
 #!/usr/bin/env python
 
+from functools import cached_property
+import logging
 import math
 
 from thdm_scanner.utility.utils import fortran_s_to_d, d_to_fortran_s
 
 
+logger = logging.getLogger(__name__)
+
+
 class LHAEntry(object):
     """Class representing an entry in an LHA input or output file"""
 
+    __slots__ = ("_name", "_value", "_comment", "_entry_str")
+
     def __init__(self, name, value, comment=""):
         self._name = name
         self._value = value
         self._comment = comment
+        # Formatted entry, only rebuilt after the value changed
+        self._entry_str = None
 
     @property
     def name(self):
@@ -24,23 +33,28 @@ class LHAEntry(object):
     @value.setter
     def value(self, val):
         self._value = val
+        self._entry_str = None
 
     def __repr__(self):
         return "LHAEntry(name={n}, value={val})".format(n=self._name,
                                                         val=self._value)
 
     def __str__(self):
-        if "," in self.name:
+        if self._entry_str is not None:
+            return self._entry_str
+        name1, sep, name2 = self._name.partition(",")
+        if sep:
             entry_str = "{name1:>5}{name2:>5}\t{val} #  {com}".format(
-                            name1=self.name.split(",")[0],
-                            name2=self.name.split(",")[1],
+                            name1=name1,
+                            name2=name2,
                             val=self._value,
                             com=self._comment)
         else:
             entry_str = "{name:>5}\t{val} #  {com}".format(
-                            name=self.name,
+                            name=self._name,
                             val=self._value,
                             com=self._comment)
+        self._entry_str = entry_str
         return entry_str
 
     def __eq__(self, other):
@@ -53,10 +67,14 @@ class LHABlock(object):
     A block consists of one or more entries.
     """
 
+    __slots__ = ("_name", "_comment", "_entries", "_entry_index")
+
     def __init__(self, name, comment=""):
         self._name = name
         self._comment = comment
         self._entries = []
+        # Entries of the block by name for fast lookup
+        self._entry_index = {}
 
     def __repr__(self):
         return "LHABlock(name={n})".format(n=self._name)
@@ -69,20 +87,18 @@ class LHABlock(object):
             blk_str = "Block {name} # {com}".format(
                         name=self._name,
                         com=self._comment)
-
-        for entry in self._entries:
-            blk_str += "\n{}".format(entry)
-        return blk_str
+        return "\n".join([blk_str] + [str(entry) for entry in self._entries])
 
     @property
     def name(self):
         return self._name
 
     def add_entry(self, entry):
-        if entry in self._entries:
+        if entry.name in self._entry_index:
             raise ValueError("Entry {} already in block.".format(repr(entry)))
         else:
             self._entries.append(entry)
+            self._entry_index[entry.name] = entry
 
     def add_entry_from_vals(self, *vals):
         # First create entry from given values
@@ -91,19 +107,16 @@ class LHABlock(object):
         self.add_entry(entry)
 
     def get_value(self, key):
-        for ent in self._entries:
-            if ent.name == key:
-                return ent.value
-        else:
+        try:
+            return self._entry_index[key].value
+        except KeyError:
             raise KeyError("No entry with name `{}` in {}".format(
                             key, self))
 
     def set_value(self, key, value):
-        for ent in self._entries:
-            if ent.name == key:
-                ent.value = value
-                break
-        else:
+        try:
+            self._entry_index[key].value = value
+        except KeyError:
             raise KeyError("No entry with name `{}` in {}".format(
                             key, self))
 
@@ -111,6 +124,8 @@ class LHABlock(object):
 class DecayEntry(object):
     """Class representing an decay entry in an LHA output file"""
 
+    __slots__ = ("_decay_products", "_br", "_nda")
+
     def __init__(self, prod1, prod2, br, nda):
         self._decay_products = (prod1, prod2)
         self._br = br
@@ -133,8 +148,8 @@ class DecayEntry(object):
         return "{br:>5}\t{nda}\t{id1}\t{id2}".format(
                     br=self._br,
                     nda=self._nda,
-                    id1=self.decay_products[0],
-                    id2=self.decay_products[1])
+                    id1=self._decay_products[0],
+                    id2=self._decay_products[1])
 
     def __eq__(self, other):
         return self.decay_products[0] == other.decay_products[0] \
@@ -156,6 +171,9 @@ class DecayBlock(object):
     A block consists of one or more entries.
     """
 
+    __slots__ = ("_particle", "_width", "_comment", "_br_ratios",
+                 "_br_index")
+
     _inline_comment = "#\t BR \t NDA \t ID1 \t ID2"
 
     def __init__(self, particle, width, comment=""):
@@ -163,6 +181,8 @@ class DecayBlock(object):
         self._width = width
         self._comment = comment
         self._br_ratios = []
+        # Branching ratios of the block by decay products for fast lookup
+        self._br_index = {}
 
     def __repr__(self):
         return "DecayBlock(particle={p})".format(p=self._particle)
@@ -173,25 +193,36 @@ class DecayBlock(object):
                     width=self._width,
                     com=self._comment,
                     icom=self._inline_comment)
-        for br_ratio in self._br_ratios:
-            dec_str += "\n{}".format(br_ratio)
-        return dec_str
+        return "\n".join([dec_str]
+                         + [str(br_ratio) for br_ratio in self._br_ratios])
+
+    @property
+    def name(self):
+        # Decay blocks are identified by the decaying particle
+        return self._particle
 
     def add_branching_ratio(self, br_ratio):
-        if br_ratio in self._br_ratios:
+        if br_ratio.decay_products in self._br_index:
             raise ValueError("Entry already in decay block.")
         else:
             self._br_ratios.append(br_ratio)
+            self._br_index[br_ratio.decay_products] = br_ratio
 
     def get_branching_ratio(self, dec_prods):
-        for entry in self._br_ratios:
-            if entry._decay_products == dec_prods:
-                return entry.br
-        else:
-            print("No decay with products {} in:\n{}".format(
-                            dec_prods, self))
-            print("Setting BR to 0.")
+        entry = self._br_index.get(dec_prods)
+        if entry is None:
+            logger.debug("No decay with products %s in:\n%s",
+                         dec_prods, self)
+            logger.debug("Setting BR to 0.")
             return "0."
+        return entry.br
+
+    def get_value(self, key):
+        return self.get_branching_ratio(tuple(key.split(",")))
+
+    def set_value(self, key, value):
+        raise NotImplementedError(
+                "Setting of branching ratios not supported")
 
 
 class LHAFile(object):
@@ -203,6 +234,8 @@ class LHAFile(object):
     def __init__(self, filename):
         self._filename = filename
         self._blocks = []
+        # Blocks by name and decay blocks by particle for fast lookup
+        self._block_index = {}
         self._comment = ""
 
     def __repr__(self):
@@ -213,87 +246,95 @@ class LHAFile(object):
         return self._filename
 
     def read_file(self):
+        # Read the whole file at once and parse it from memory
         with open(self.filename, "r") as fi:
-            _first_blk_found = False
-            _last_was_blk = None
-            for line in fi:
-                line = line.rstrip("\n")
-                cmnt = ""
-                if not (line.startswith("Block")
-                        or line.startswith("DECAY")
-                        or line.startswith("BLOCK")) and not _first_blk_found:
-                    if self._comment == "":
-                        self._comment += "{}".format(line)
-                    else:
-                        self._comment += "\n{}".format(line)
-                elif line.lstrip().startswith("#"):
-                    continue
-                elif (line.startswith("Block")
-                        or line.startswith("BLOCK")):
-                    _first_blk_found = True
-                    if "#" in line:
-                        _, blk_name, cmnt = line.split(None, 2)  # for python 3 use maxsplit  # noqa: E501
-                        cmnt = cmnt.lstrip("# ")
-                    else:
-                        _, blk_name = line.split()
-                    self._blocks.append(LHABlock(blk_name, cmnt))
-                    _last_was_blk = True
-                elif line.startswith("DECAY"):
-                    _first_blk_found = True
-                    _, particle, width, cmnt = line.split(None, 3)
-                    cmnt = cmnt.lstrip("# ")
-                    self._blocks.append(DecayBlock(particle, width, cmnt))
-                    _last_was_blk = False
+            lines = fi.read().splitlines()
+        self._parse_lines(lines)
+        return
+
+    def _parse_lines(self, lines):
+        _first_blk_found = False
+        _last_was_blk = None
+        for line in lines:
+            # Block and decay headers are identified by their keyword
+            kind = line[:5]
+            if kind == "Block" or kind == "BLOCK":
+                _first_blk_found = True
+                # Everything after the block name, e.g. the scale Q= of
+                # SLHA blocks, is kept as comment of the block
+                fields = line.split(None, 2)
+                blk_name = fields[1]
+                cmnt = fields[2].lstrip("# ") if len(fields) > 2 else ""
+                self._add_block(LHABlock(blk_name, cmnt))
+                _last_was_blk = True
+            elif kind == "DECAY":
+                _first_blk_found = True
+                data, _, cmnt = line.partition("#")
+                _, particle, width = data.split()
+                self._add_block(DecayBlock(particle, width, cmnt.strip()))
+                _last_was_blk = False
+            elif not _first_blk_found:
+                if self._comment == "":
+                    self._comment += "{}".format(line)
                 else:
-                    if _last_was_blk:
-                        if len(line.split("#")[0].split()) == 1:
-                            name = ""
-                            value = line.split("#")[0].strip()
-                            cmnt = line.split("#")[1].strip()
-                        elif len(line.split("#")[0].split()) == 3:
-                            # Special treatment for CKM matrix element
-                            # in input file
-                            name1, name2, value, cmnt = line.split(None, 3)
-                            name = ",".join([name1, name2])
-                        else:
-                            name, value, cmnt = line.split(None, 2)
-                            cmnt = cmnt.lstrip("# ")
-                        self._blocks[-1].add_entry(LHAEntry(name, value, cmnt))
+                    self._comment += "\n{}".format(line)
+            elif line.lstrip().startswith("#"):
+                continue
+            else:
+                if _last_was_blk:
+                    # Split off the comment once and dispatch on the
+                    # number of values in front of it
+                    data, _, cmnt = line.partition("#")
+                    cmnt = cmnt.strip()
+                    values = data.split()
+                    if len(values) == 1:
+                        name = ""
+                        value = values[0]
+                    elif len(values) == 3:
+                        # Special treatment for CKM matrix element
+                        # in input file
+                        name = ",".join(values[:2])
+                        value = values[2]
                     else:
-                        br, nda, prod1, prod2 = line.split()
-                        self._blocks[-1].add_branching_ratio(
-                                DecayEntry(prod1, prod2, br, nda))
+                        name, value = values[:2]
+                    self._blocks[-1].add_entry(LHAEntry(name, value, cmnt))
+                else:
+                    br, nda, prod1, prod2 = line.split()
+                    self._blocks[-1].add_branching_ratio(
+                            DecayEntry(prod1, prod2, br, nda))
         return
 
     def write_file(self, fname=None):
         # Allow writing to a different file than the one that was read.
+        parts = [self._comment] if len(self._comment) > 0 else []
+        parts.extend(str(block) for block in self._blocks)
+        # Write the whole file at once
         with open(self.filename if fname is None else fname, "w") as fo:
-            _wrote_line = False
-            if len(self._comment) > 0:
-                fo.write(self._comment)
-                _wrote_line = True
-            for block in self._blocks:
-                if _wrote_line:
-                    fo.write("\n")
-                fo.write(str(block))
-                _wrote_line = True
+            fo.write("\n".join(parts))
         return
 
+    def _add_block(self, block):
+        self._blocks.append(block)
+        self._block_index.setdefault(block.name, block)
+
     def _get_entry_value(self, blk_name, key):
-        for block in self._blocks:
-            if isinstance(block, LHABlock):
-                if block.name == blk_name:
-                    return block.get_value(key)
-            else:
-                if block._particle == blk_name:
-                    br_key = tuple(key.split(","))
-                    br = block.get_branching_ratio(br_key)
-                    return br
-        else:
+        block = self._block_index.get(blk_name)
+        if block is None:
             raise KeyError("No block `{}` in {}".format(blk_name, self))
+        # Decay blocks return the branching ratio for keys of the decay
+        # products like "15,-15"
+        return block.get_value(key)
+
+    def _get_branching_ratio(self, particle, dec_prods):
+        block = self._block_index.get(particle)
+        if block is None:
+            raise KeyError("No block `{}` in {}".format(particle, self))
+        return block.get_branching_ratio(dec_prods)
 
     def _set_entry_value(self, blk_name, key, value,
                          choices=None):
+        # Allowed values must be given as a container like a (frozen)set,
+        # a one-shot iterator would be consumed by the first check
         if choices is not None:
             if value not in choices:
                 err_mssg = ("Given value {} for key {} in block {} not allowed. "  # noqa: E501
@@ -301,124 +342,135 @@ class LHAFile(object):
                                 value, key,
                                 blk_name, choices))
                 raise ValueError(err_mssg)
-        for block in self._blocks:
-            if isinstance(block, LHABlock):
-                if block.name == blk_name:
-                    block.set_value(key, value)
-                    break
-            else:
-                raise NotImplementedError(
-                        "Setting of branching ratios not supported")
-        else:
-            raise KeyError("No block `{}` in {}".format(blk_name, self))
+        self._set_entry_values(blk_name, (key,), value)
 
+    def _set_entry_values(self, blk_name, keys, value):
+        # Set the same value for several entries of a block
+        block = self._block_index.get(blk_name)
+        if block is None:
+            raise KeyError("No block `{}` in {}".format(blk_name, self))
+        for key in keys:
+            block.set_value(key, value)
 
-class SusHiInput(LHAFile):
 
-    def __init__(self, filename):
-        super(SusHiInput, self).__init__(filename)
+# Members of the pdf set allowed in the SusHi input
+_PDF_SET_CHOICES = frozenset(map(str, range(103)))
+# Default content of the SusHi input file given as block name, block
+# comment and the name, value and comment of the entries of the block
+_SUSHI_INPUT_BLOCKS = (
         # sushi inputs
-        sushi_block = LHABlock("SUSHI")
-        sushi_block.add_entry_from_vals("1", "2", "model: 0 = SM, 1 = MSSM, 2 = 2HDM, 3 = NMSSM")  # noqa: E501
-        sushi_block.add_entry_from_vals("2", "11", "11 = h, 12 = H, 21 = A")
-        sushi_block.add_entry_from_vals("3", "0", "collider: 0 = p-p, 1 = p-pbar")  # noqa: E501
-        sushi_block.add_entry_from_vals("4", "13000.d0", "center-of-mass energy in GeV")  # noqa: E501
-        sushi_block.add_entry_from_vals("5", "2", "order ggh: -1 = off, 0 = LO, 1 = NLO, 2 = NNLO, 3 = N3LO")  # noqa: E501
-        sushi_block.add_entry_from_vals("6", "2", "order bbh: -1 = off, 0 = LO, 1 = NLO, 2 = NNLO")  # noqa: E501
-        sushi_block.add_entry_from_vals("7", "1", "electroweak cont. for ggh:")
-        sushi_block.add_entry_from_vals("19", "0", "0 = silent mode of SusHi, 1 = normal output")  # noqa: E501
-        sushi_block.add_entry_from_vals("20", "0", "ggh@nnlo subprocesses: 0=all, 10=ind. contributions")  # noqa: E501
+        ("SUSHI", "", (
+            ("1", "2", "model: 0 = SM, 1 = MSSM, 2 = 2HDM, 3 = NMSSM"),
+            ("2", "11", "11 = h, 12 = H, 21 = A"),
+            ("3", "0", "collider: 0 = p-p, 1 = p-pbar"),
+            ("4", "13000.d0", "center-of-mass energy in GeV"),
+            ("5", "2", "order ggh: -1 = off, 0 = LO, 1 = NLO, 2 = NNLO, 3 = N3LO"),  # noqa: E501
+            ("6", "2", "order bbh: -1 = off, 0 = LO, 1 = NLO, 2 = NNLO"),
+            ("7", "1", "electroweak cont. for ggh:"),
+            ("19", "0", "0 = silent mode of SusHi, 1 = normal output"),
+            ("20", "0", "ggh@nnlo subprocesses: 0=all, 10=ind. contributions"),
+            )),
         # 2HDMC input block
-        thdmc_block = LHABlock("2HDMC", "2HDMC arXiv:0902.0851")
-        thdmc_block.add_entry_from_vals("-1", "0", "CMD line mode: 0 direct link to library, 1 command line mode")  # noqa: E501
-        thdmc_block.add_entry_from_vals("1", "3", "2HDMC key, 1=lambda basis, 2=physical basis, 3=H2 basis")  # noqa: E501
-        thdmc_block.add_entry_from_vals("2", "2", "2HDM version type: (1=Type I,2=Type II,3=Flipped,4=Lepton Specific)")  # noqa: E501
-        thdmc_block.add_entry_from_vals("3", "10.", "tan(beta)")
-        thdmc_block.add_entry_from_vals("4", "100.", "m12")
-        thdmc_block.add_entry_from_vals("21", "125.38d0", "mh")
-        thdmc_block.add_entry_from_vals("22", "300d0", "mH")
-        thdmc_block.add_entry_from_vals("23", "400d0", "mA")
-        thdmc_block.add_entry_from_vals("24", "400d0", "mC")
-        thdmc_block.add_entry_from_vals("25", "0.995", "sin(beta-alpha)")
-        thdmc_block.add_entry_from_vals("26", "0.0d0", "lambda_6")
-        thdmc_block.add_entry_from_vals("27", "0.0d0", "lambda_7")
-        thdmc_block.add_entry_from_vals("31", "125.38d0", "mh")
-        thdmc_block.add_entry_from_vals("32", "200.d0", "mH")
-        thdmc_block.add_entry_from_vals("33", "0.5d0", "sin(beta-alpha)")
-        thdmc_block.add_entry_from_vals("34", "0.1d0", "Z4")
-        thdmc_block.add_entry_from_vals("35", "0.1d0", "Z5")
-        thdmc_block.add_entry_from_vals("36", "0.1d0", "Z7")
+        ("2HDMC", "2HDMC arXiv:0902.0851", (
+            ("-1", "0", "CMD line mode: 0 direct link to library, 1 command line mode"),  # noqa: E501
+            ("1", "3", "2HDMC key, 1=lambda basis, 2=physical basis, 3=H2 basis"),  # noqa: E501
+            ("2", "2", "2HDM version type: (1=Type I,2=Type II,3=Flipped,4=Lepton Specific)"),  # noqa: E501
+            ("3", "10.", "tan(beta)"),
+            ("4", "100.", "m12"),
+            ("21", "125.38d0", "mh"),
+            ("22", "300d0", "mH"),
+            ("23", "400d0", "mA"),
+            ("24", "400d0", "mC"),
+            ("25", "0.995", "sin(beta-alpha)"),
+            ("26", "0.0d0", "lambda_6"),
+            ("27", "0.0d0", "lambda_7"),
+            ("31", "125.38d0", "mh"),
+            ("32", "200.d0", "mH"),
+            ("33", "0.5d0", "sin(beta-alpha)"),
+            ("34", "0.1d0", "Z4"),
+            ("35", "0.1d0", "Z5"),
+            ("36", "0.1d0", "Z7"),
+            )),
         # SM Input block
-        sm_block = LHABlock("SMINPUTS", "Standard Model inputs")
-        sm_block.add_entry_from_vals("1", "1.27934000e+02", "alpha_em^(-1)(MZ) SM MSbar")  # noqa: E501
-        sm_block.add_entry_from_vals("2", "1.16637000e-05", "G_Fermi")
-        # sm_block.add_entry_from_vals("3", "1.17200000e-01", "alpha_s(MZ) SM MSbar")  # noqa: E501
-        sm_block.add_entry_from_vals("3", "1.18000000e-01", "alpha_s(MZ) SM MSbar")  # noqa: E501
-        sm_block.add_entry_from_vals("4", "9.11876000e+01", "m_Z(pole)")
-        sm_block.add_entry_from_vals("5", "4.18000000e+00", "m_b(m_b)")
-        sm_block.add_entry_from_vals("6", "1.72500000e+02", "m_t(pole)")
-        sm_block.add_entry_from_vals("8", "1.27900000e+00", "m_c(m_c)")
+        ("SMINPUTS", "Standard Model inputs", (
+            ("1", "1.27934000e+02", "alpha_em^(-1)(MZ) SM MSbar"),
+            ("2", "1.16637000e-05", "G_Fermi"),
+            # ("3", "1.17200000e-01", "alpha_s(MZ) SM MSbar"),
+            ("3", "1.18000000e-01", "alpha_s(MZ) SM MSbar"),
+            ("4", "9.11876000e+01", "m_Z(pole)"),
+            ("5", "4.18000000e+00", "m_b(m_b)"),
+            ("6", "1.72500000e+02", "m_t(pole)"),
+            ("8", "1.27900000e+00", "m_c(m_c)"),
+            )),
         # distribution blocPDF4LHC15_nnlo_mc
-        dist_block = LHABlock("DISTRIB")
-        dist_block.add_entry_from_vals("1", "0", "distribution : 0 = sigma_total, 1 = dsigma/dpt,")  # noqa: E501
-        dist_block.add_entry_from_vals("2", "0", "pt-cut: 0 = no, 1 = pt > ptmin, 2 = pt < ptmax,")  # noqa: E501
-        dist_block.add_entry_from_vals("21", "30.d0", "minimal pt-value ptmin in GeV")  # noqa: E501
-        dist_block.add_entry_from_vals("22", "100.d0", "maximal pt-value ptmax in GeV")  # noqa: E501
-        dist_block.add_entry_from_vals("3", "0", "rapidity-cut: 0 = no, 1 = Abs[y] < ymax,")  # noqa: E501
-        dist_block.add_entry_from_vals("31", "0.5d0", "minimal rapidity ymin")
-        dist_block.add_entry_from_vals("32", "1.5d0", "maximal rapidity ymax")
-        dist_block.add_entry_from_vals("4", "0", "0 = rapidity, 1 = pseudorapidity")  # noqa: E501
+        ("DISTRIB", "", (
+            ("1", "0", "distribution : 0 = sigma_total, 1 = dsigma/dpt,"),
+            ("2", "0", "pt-cut: 0 = no, 1 = pt > ptmin, 2 = pt < ptmax,"),
+            ("21", "30.d0", "minimal pt-value ptmin in GeV"),
+            ("22", "100.d0", "maximal pt-value ptmax in GeV"),
+            ("3", "0", "rapidity-cut: 0 = no, 1 = Abs[y] < ymax,"),
+            ("31", "0.5d0", "minimal rapidity ymin"),
+            ("32", "1.5d0", "maximal rapidity ymax"),
+            ("4", "0", "0 = rapidity, 1 = pseudorapidity"),
+            )),
         # Scales input block
-        scale_block = LHABlock("SCALES")
-        scale_block.add_entry_from_vals("1", "0.5", "renormalization scale muR/mh")  # noqa: E501
-        scale_block.add_entry_from_vals("2", "0.5", "factorization scale muF/mh")  # noqa: E501
-        scale_block.add_entry_from_vals("11", "1.0", "renormalization scale muR/mh for bbh")  # noqa: E501
-        scale_block.add_entry_from_vals("12", "0.25", "factorization scale muF/mh for bbh")  # noqa: E501
-        scale_block.add_entry_from_vals("3", "0", "1 = Use (muR,muF)/Sqrt(mh^2+pt^2) for dsigma/dpt and d^2sigma/dy/dpt")  # noqa: E501
+        ("SCALES", "", (
+            ("1", "0.5", "renormalization scale muR/mh"),
+            ("2", "0.5", "factorization scale muF/mh"),
+            ("11", "1.0", "renormalization scale muR/mh for bbh"),
+            ("12", "0.25", "factorization scale muF/mh for bbh"),
+            ("3", "0", "1 = Use (muR,muF)/Sqrt(mh^2+pt^2) for dsigma/dpt and d^2sigma/dy/dpt"),  # noqa: E501
+            )),
         # Bottom renormalization input
-        renorm_block = LHABlock("RENORMBOT", "Renormalization of the bottom sector")  # noqa: E501
-        renorm_block.add_entry_from_vals("1", "0", "m_b used for bottom Yukawa:  0 = OS, 1 = MSbar(m_b), 2 = MSbar(muR)")  # noqa: E501
-        renorm_block.add_entry_from_vals("4", "4.75d0", "Fixed value of m_b^OS")  # noqa: E501
+        ("RENORMBOT", "Renormalization of the bottom sector", (
+            ("1", "0", "m_b used for bottom Yukawa:  0 = OS, 1 = MSbar(m_b), 2 = MSbar(muR)"),  # noqa: E501
+            ("4", "4.75d0", "Fixed value of m_b^OS"),
+            )),
         # PDF input block
-        pdf_block = LHABlock("PDFSPEC")
-        pdf_block.add_entry_from_vals("1", "MMHT2014lo68cl.LHgrid", "name of pdf (lo)")  # noqa: E501
-        pdf_block.add_entry_from_vals("2", "PDF4LHC15_nlo_mc_pdfas.LHgrid", "name of pdf (nlo)")  # noqa: E501
-        pdf_block.add_entry_from_vals("3", "PDF4LHC15_nnlo_mc_pdfas.LHgrid", "name of pdf (nnlo)")  # noqa: E501
-        pdf_block.add_entry_from_vals("4", "PDF4LHC15_nnlo_mc_pdfas.LHgrid", "name of pdf (n3lo)")  # noqa: E501
-        # pdf_block.add_entry_from_vals("10", "0", "set number - if different for LO, NLO, NNLO, N3LO use entries 11, 12, 13")  # noqa: E501
-        pdf_block.add_entry_from_vals("11", "0", "set number - if different for LO, NLO, NNLO, N3LO use entries 11, 12, 13")  # noqa: E501
-        pdf_block.add_entry_from_vals("12", "0", "set number - if different for LO, NLO, NNLO, N3LO use entries 11, 12, 13")  # noqa: E501
-        pdf_block.add_entry_from_vals("13", "0", "set number - if different for LO, NLO, NNLO, N3LO use entries 11, 12, 13")  # noqa: E501
+        ("PDFSPEC", "", (
+            ("1", "MMHT2014lo68cl.LHgrid", "name of pdf (lo)"),
+            ("2", "PDF4LHC15_nlo_mc_pdfas.LHgrid", "name of pdf (nlo)"),
+            ("3", "PDF4LHC15_nnlo_mc_pdfas.LHgrid", "name of pdf (nnlo)"),
+            ("4", "PDF4LHC15_nnlo_mc_pdfas.LHgrid", "name of pdf (n3lo)"),
+            # ("10", "0", "set number - if different for LO, NLO, NNLO, N3LO use entries 11, 12, 13"),  # noqa: E501
+            ("11", "0", "set number - if different for LO, NLO, NNLO, N3LO use entries 11, 12, 13"),  # noqa: E501
+            ("12", "0", "set number - if different for LO, NLO, NNLO, N3LO use entries 11, 12, 13"),  # noqa: E501
+            ("13", "0", "set number - if different for LO, NLO, NNLO, N3LO use entries 11, 12, 13"),  # noqa: E501
+            )),
         # vegas input block
-        vegas_block = LHABlock("VEGAS")
-        vegas_block.add_entry_from_vals("1", "10000", "Number of points")
-        vegas_block.add_entry_from_vals("2", "5", "Number of iterations")
-        vegas_block.add_entry_from_vals("3", "10", "Output format of VEGAS integration")  # noqa: E501
-        vegas_block.add_entry_from_vals("4", "2000", "Number of points")
-        vegas_block.add_entry_from_vals("5", "5", "Number of iterations")
-        vegas_block.add_entry_from_vals("14", "5000", "Number of points in second run")  # noqa: E501
-        vegas_block.add_entry_from_vals("15", "2", "Number of iterations in second run")  # noqa: E501
-        vegas_block.add_entry_from_vals("6", "0", "Output format of VEGAS integration")  # noqa: E501
-        vegas_block.add_entry_from_vals("7", "2000", "Number of points")
-        vegas_block.add_entry_from_vals("8", "5", "Number of iterations")
-        vegas_block.add_entry_from_vals("17", "5000", "Number of points in second run")  # noqa: E501
-        vegas_block.add_entry_from_vals("18", "2", "Number of iterations in second run")  # noqa: E501
-        vegas_block.add_entry_from_vals("9", "0", "Output format of VEGAS integration")  # noqa: E501
+        ("VEGAS", "", (
+            ("1", "10000", "Number of points"),
+            ("2", "5", "Number of iterations"),
+            ("3", "10", "Output format of VEGAS integration"),
+            ("4", "2000", "Number of points"),
+            ("5", "5", "Number of iterations"),
+            ("14", "5000", "Number of points in second run"),
+            ("15", "2", "Number of iterations in second run"),
+            ("6", "0", "Output format of VEGAS integration"),
+            ("7", "2000", "Number of points"),
+            ("8", "5", "Number of iterations"),
+            ("17", "5000", "Number of points in second run"),
+            ("18", "2", "Number of iterations in second run"),
+            ("9", "0", "Output format of VEGAS integration"),
+            )),
         # factors block
-        fact_block = LHABlock("FACTORS")
-        fact_block.add_entry_from_vals("1", "0.d0", "factor for yukawa-couplings: c")  # noqa: E501
-        fact_block.add_entry_from_vals("2", "1.d0", "t")
-        fact_block.add_entry_from_vals("3", "1.d0", "b")
-        # block addition
-        self._blocks.append(sushi_block)
-        self._blocks.append(thdmc_block)
-        self._blocks.append(sm_block)
-        self._blocks.append(dist_block)
-        self._blocks.append(scale_block)
-        self._blocks.append(renorm_block)
-        self._blocks.append(pdf_block)
-        self._blocks.append(vegas_block)
-        self._blocks.append(fact_block)
+        ("FACTORS", "", (
+            ("1", "0.d0", "factor for yukawa-couplings: c"),
+            ("2", "1.d0", "t"),
+            ("3", "1.d0", "b"),
+            )),
+        )
+
+
+class SusHiInput(LHAFile):
+
+    def __init__(self, filename):
+        super(SusHiInput, self).__init__(filename)
+        for blk_name, blk_comment, entries in _SUSHI_INPUT_BLOCKS:
+            block = LHABlock(blk_name, blk_comment)
+            for vals in entries:
+                block.add_entry_from_vals(*vals)
+            self._add_block(block)
 
     def __repr__(self):
         return "SusHiInput(fname={})".format(self.filename)
@@ -468,8 +520,7 @@ class SusHiInput(LHAFile):
 
     @mh.setter
     def mh(self, mh):
-        self._set_entry_value("2HDMC", "31", d_to_fortran_s(mh))
-        self._set_entry_value("2HDMC", "21", d_to_fortran_s(mh))
+        self._set_entry_values("2HDMC", ("31", "21"), d_to_fortran_s(mh))
 
     @property
     def mH(self):
@@ -477,8 +528,7 @@ class SusHiInput(LHAFile):
 
     @mH.setter
     def mH(self, mH):
-        self._set_entry_value("2HDMC", "32", d_to_fortran_s(mH))
-        self._set_entry_value("2HDMC", "22", d_to_fortran_s(mH))
+        self._set_entry_values("2HDMC", ("32", "22"), d_to_fortran_s(mH))
 
     @property
     def sin_betal(self):
@@ -486,8 +536,7 @@ class SusHiInput(LHAFile):
 
     @sin_betal.setter
     def sin_betal(self, sin):
-        self._set_entry_value("2HDMC", "33", d_to_fortran_s(sin))
-        self._set_entry_value("2HDMC", "25", d_to_fortran_s(sin))
+        self._set_entry_values("2HDMC", ("33", "25"), d_to_fortran_s(sin))
 
     @property
     def Z4(self):
@@ -561,10 +610,11 @@ class SusHiInput(LHAFile):
 
     @pdf_set.setter
     def pdf_set(self, pdf_set):
-        self._set_entry_value("PDFSPEC", "12", str(pdf_set),
-                              choices=map(str, range(103)))
-        self._set_entry_value("PDFSPEC", "13", str(pdf_set),
-                              choices=map(str, range(103)))
+        pdf_set = str(pdf_set)
+        self._set_entry_value("PDFSPEC", "12", pdf_set,
+                              choices=_PDF_SET_CHOICES)
+        self._set_entry_value("PDFSPEC", "13", pdf_set,
+                              choices=_PDF_SET_CHOICES)
 
     @property
     def alpha_s(self):
@@ -581,56 +631,56 @@ class THDMCOutput(LHAFile):
         super(THDMCOutput, self).__init__(filename)
         self.read_file()
 
-    @property
+    @cached_property
     def valid_model(self):
         val_flags = []
         for key in range(1, 5):
             val_flags.append(int(self._get_entry_value("THDM", str(key))))
         return sum(val_flags) == 4
 
-    @property
+    @cached_property
     def valid_params(self):
         return int(self._get_entry_value("THDM", str(1))) == 1
 
-    @property
+    @cached_property
     def unitarity(self):
         return int(self._get_entry_value("THDM", str(2))) == 1
 
-    @property
+    @cached_property
     def perturbativity(self):
         return int(self._get_entry_value("THDM", str(3))) == 1
 
-    @property
+    @cached_property
     def stability(self):
         return int(self._get_entry_value("THDM", str(4))) == 1
 
-    @property
+    @cached_property
     def mh(self):
         return float(self._get_entry_value("MASS", "25"))
 
-    @property
+    @cached_property
     def mH(self):
         return float(self._get_entry_value("MASS", "35"))
 
-    @property
+    @cached_property
     def mA(self):
         return float(self._get_entry_value("MASS", "36"))
 
-    @property
+    @cached_property
     def mHp(self):
         return float(self._get_entry_value("MASS", "37"))
 
-    @property
+    @cached_property
     def br_htautau(self):
-        return float(self._get_entry_value("25", "15,-15"))
+        return float(self._get_branching_ratio("25", ("15", "-15")))
 
-    @property
+    @cached_property
     def br_Htautau(self):
-        return float(self._get_entry_value("35", "15,-15"))
+        return float(self._get_branching_ratio("35", ("15", "-15")))
 
-    @property
+    @cached_property
     def br_Atautau(self):
-        return float(self._get_entry_value("36", "15,-15"))
+        return float(self._get_branching_ratio("36", ("15", "-15")))
 
 
 class SusHiOutput(LHAFile):
@@ -639,22 +689,22 @@ class SusHiOutput(LHAFile):
         super(SusHiOutput, self).__init__(filename)
         self.read_file()
 
-    @property
+    @cached_property
     def xs_ggPhi(self):
         return float(self._get_entry_value("SUSHIggh", "1"))
 
-    @property
+    @cached_property
     def xs_ggPhi_scale_up(self):
         return float(self._get_entry_value("SUSHIggh", "103"))
 
-    @property
+    @cached_property
     def xs_ggPhi_scale_down(self):
         return float(self._get_entry_value("SUSHIggh", "102"))
 
-    @property
+    @cached_property
     def xs_bbPhi(self):
         return float(self._get_entry_value("SUSHIbbh", "1"))
 
-    @property
+    @cached_property
     def mPhi(self):
         return float(self._get_entry_value("MASSOUT", "1"))
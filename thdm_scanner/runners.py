@@ -1,14 +1,14 @@
 #!/usr/bin/env python
 
 from abc import ABCMeta, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import os
 import subprocess
-import multiprocessing
 import logging
 import math
 
-import numpy as np
-
 import thdm_scanner
 import thdm_scanner.lha_utils as lha_utils
 
@@ -16,8 +16,19 @@ import thdm_scanner.lha_utils as lha_utils
 logger = logging.getLogger(__name__)
 
 
-class THDMRunnerABC(object):
-    __metaclass__ = ABCMeta
+def _run_command(args, **kwargs):
+    # File descriptors opened by Python are not inherited anyway, without
+    # closing them subprocess can launch the process via posix_spawn
+    # instead of forking the whole interpreter.
+    return subprocess.run(args, close_fds=False, **kwargs)
+
+
+def _start_command(args, **kwargs):
+    # Same as _run_command without waiting for the process to finish
+    return subprocess.Popen(args, close_fds=False, **kwargs)
+
+
+class THDMRunnerABC(metaclass=ABCMeta):
 
     def __init__(self):
         pass
@@ -36,87 +47,59 @@ class THDMCRunner(THDMRunnerABC):
 
     def __init__(self, outpath="output",
                  scan_parameters=("mH", "tanb")):
-        self._outputfile = os.path.join(outpath, "2HDMC_output.out")
+        # Name of the output file to be filled with the scan point
+        self._outputfile = os.path.join(
+                outpath,
+                "2HDMC_output.{}.{{}}.{}.{{}}.out".format(*scan_parameters))
         self._scan_params = scan_parameters
+        thdmc_path = os.path.join(os.environ["THEORY_CODE_PATH"],
+                                  "2HDMC-1.8.0")
+        self._calc_hybrid = os.path.join(thdmc_path, "CalcHybrid")
+        self._calc_phys = os.path.join(thdmc_path, "CalcPhys")
 
     def set_inputs(self, inputs):
         self._input = inputs
 
     def run(self, hybrid_basis=True):
-        self._outputfile = self._outputfile.replace(
-                ".out",
-                ".{}.{}.{}.{}.out".format(self._scan_params[0],
-                                          getattr(self._input,
-                                                  self._scan_params[0]),
-                                          self._scan_params[1],
-                                          getattr(self._input,
-                                                  self._scan_params[1])
-                                          ))
+        # Output file of this point, the runner may be reused for others
+        outputfile = self._outputfile.format(
+                getattr(self._input, self._scan_params[0]),
+                getattr(self._input, self._scan_params[1]))
         # Run 2HDMC code with correct inputs
         if hybrid_basis:
-            logger.info("Running 2HDMC with command {}".format(
-                            " ".join([os.path.join(os.environ["THEORY_CODE_PATH"],
-                                                   "2HDMC-1.8.0",
-                                                   "CalcHybrid"),
-                                      str(self._input.mh),
-                                      str(self._input.mH),
-                                      str(self._input.cos_betal),
-                                      str(self._input.Z4),
-                                      str(self._input.Z5),
-                                      str(self._input.Z7),
-                                      str(self._input.tanb),
-                                      str(self._input.type),
-                                      self._outputfile])))
-            subprocess.run([os.path.join(os.environ["THEORY_CODE_PATH"],
-                                         "2HDMC-1.8.0",
-                                         "CalcHybrid"),
-                            str(self._input.mh),
-                            str(self._input.mH),
-                            str(self._input.cos_betal),
-                            str(self._input.Z4),
-                            str(self._input.Z5),
-                            str(self._input.Z7),
-                            str(self._input.tanb),
-                            str(self._input.type),
-                            self._outputfile],
-                           stdout=subprocess.DEVNULL)
+            command = [self._calc_hybrid,
+                       str(self._input.mh),
+                       str(self._input.mH),
+                       str(self._input.cos_betal),
+                       str(self._input.Z4),
+                       str(self._input.Z5),
+                       str(self._input.Z7),
+                       str(self._input.tanb),
+                       str(self._input.type),
+                       outputfile]
         else:
+            command = [self._calc_phys,
+                       str(self._input.mh),
+                       str(self._input.mH),
+                       str(self._input.mA),
+                       str(self._input.mHp),
+                       str(self._input.sin_betal),  # Conversion between conventions done in input class
+                       str(self._input.lambda6),
+                       str(self._input.lambda7),
+                       str(self._input.m12_square),
+                       str(self._input.tanb),
+                       str(self._input.type),
+                       outputfile]
+        if logger.isEnabledFor(logging.INFO):
             logger.info("Running 2HDMC with command {}".format(
-                            " ".join([os.path.join(os.environ["THEORY_CODE_PATH"],
-                                                   "2HDMC-1.8.0",
-                                                   "CalcPhys"),
-                                      str(self._input.mh),
-                                      str(self._input.mH),
-                                      str(self._input.mA),
-                                      str(self._input.mHp),
-                                      str(self._input.sin_betal),  # Conversion between conventions done in input class
-                                      str(self._input.lambda6),
-                                      str(self._input.lambda7),
-                                      str(self._input.m12_square),
-                                      str(self._input.tanb),
-                                      str(self._input.type),
-                                      self._outputfile])))
-            subprocess.run([os.path.join(os.environ["THEORY_CODE_PATH"],
-                                         "2HDMC-1.8.0",
-                                         "CalcPhys"),
-                            str(self._input.mh),
-                            str(self._input.mH),
-                            str(self._input.mA),
-                            str(self._input.mHp),
-                            str(self._input.sin_betal),  # Conversion between conventions done in input class
-                            str(self._input.lambda6),
-                            str(self._input.lambda7),
-                            str(self._input.m12_square),
-                            str(self._input.tanb),
-                            str(self._input.type),
-                            self._outputfile],
-                           stdout=subprocess.DEVNULL)
+                        " ".join(command)))
+        _run_command(command, stdout=subprocess.DEVNULL)
         logger.debug("Check if output file has been successfully written.")
-        if not os.path.exists(self._outputfile):
+        if not os.path.exists(outputfile):
             raise RuntimeError("Output file of 2HDMC run not created.")
         else:
             logger.debug("Output file {} has been successfully written."
-                         .format(self._outputfile))
+                         .format(outputfile))
         return
 
 
@@ -124,11 +107,24 @@ class SusHiRunner(THDMRunnerABC):
 
     def __init__(self, outpath="output",
                  scan_parameters=("mH", "tanb"),
-                 run_pdf_uncerts=False):
-        self._inputfile = os.path.join(outpath, "SusHi_input.in")
-        self._outputfile = os.path.join(outpath, "SusHi.out")
+                 run_pdf_uncerts=False,
+                 pdf_workers=1):
+        # SusHi is given the file names relative to the working directory
+        outpath = os.path.relpath(outpath)
+        # Names of the input and output files to be filled with the scan
+        # point, the Higgs boson and the pdf member
+        self._inputfile = os.path.join(
+                outpath,
+                "SusHi_input.{}.{{}}.{}.{{}}.H{{}}{{}}.in".format(*scan_parameters))  # noqa: E501
+        self._outputfile = os.path.join(
+                outpath,
+                "SusHi.{}.{{}}.{}.{{}}.H{{}}{{}}.out".format(*scan_parameters))
         self._scan_params = scan_parameters
         self._run_uncerts = run_pdf_uncerts
+        # Number of SusHi runs for pdf and alpha_s variations run at once
+        self._pdf_workers = max(1, pdf_workers)
+        self._sushi = os.path.join(os.environ["THEORY_CODE_PATH"],
+                                   "SusHi-1.7.0", "bin", "sushi")
 
     def set_inputs(self, inputs):
         self._input = inputs
@@ -137,9 +133,12 @@ class SusHiRunner(THDMRunnerABC):
             hybrid_basis=True):
         # For each Higgs boson
         if multiproc:
-            with multiprocessing.Pool(3) as pool:
-                pool.map(self._run_single_higgs, [11, 12, 21],
-                         hybrid_basis)
+            # The runs mostly wait for SusHi, threads avoid copying the
+            # runner and its inputs to separate processes
+            with ThreadPoolExecutor(3) as executor:
+                list(executor.map(partial(self._run_single_higgs,
+                                          hybrid_basis=hybrid_basis),
+                                  [11, 12, 21]))
         else:
             for higgs in [11, 12, 21]:
                 self._run_single_higgs(higgs, hybrid_basis)
@@ -148,15 +147,10 @@ class SusHiRunner(THDMRunnerABC):
     def _run_single_higgs(self, higgs,
                           hybrid_basis=True):
         # Prepare input file for Higgs boson
-        infile_name = self._inputfile.replace(".in",
-                                              ".{}.{}.{}.{}.H{}.in".format(
-                                                  self._scan_params[0],
-                                                  getattr(self._input,
-                                                          self._scan_params[0]),  # noqa: E501
-                                                  self._scan_params[1],
-                                                  getattr(self._input,
-                                                          self._scan_params[1]),  # noqa: E501
-                                                  higgs))
+        point = (getattr(self._input, self._scan_params[0]),
+                 getattr(self._input, self._scan_params[1]),
+                 higgs)
+        infile_name = self._inputfile.format(*point, "")
         infile = lha_utils.SusHiInput(infile_name)
         infile.higgs_boson = higgs
         infile.mh = self._input.mh
@@ -180,19 +174,17 @@ class SusHiRunner(THDMRunnerABC):
         # Write prepared input to input file
         infile.write_file()
         # Run Sushi with prepared input
-        subprocess.run([os.path.join(os.environ["THEORY_CODE_PATH"],
-                                      "SusHi-1.7.0",
-                                      "bin",
-                                      "sushi"),
-                         os.path.relpath(infile_name),
-                         os.path.relpath(infile_name.replace("in", "out").replace("_output", ""))])  # noqa: E501
+        _run_command([self._sushi, infile_name,
+                      self._outputfile.format(*point, "")])
         # Perform a separate run for each PDF and alpha_s
         # replica to calculate uncertainty
         if self._run_uncerts:
+            # The runs are independent of each other, the next input is
+            # written while the previous SusHi processes are still running
+            running = deque()
             for pdf_member in range(1, 103):
-                inname_update = infile_name.replace(
-                    ".in",
-                    ".pdf{}.in".format(pdf_member))
+                pdf_suffix = ".pdf{}".format(pdf_member)
+                inname_update = self._inputfile.format(*point, pdf_suffix)
                 # Write prepared input to input file
                 infile.pdf_set = pdf_member
                 # TODO: alpha_s needs to be set correctly for the two alpha_s variations
@@ -201,13 +193,14 @@ class SusHiRunner(THDMRunnerABC):
                 elif pdf_member == 102:
                     infile.alpha_s = 0.1195
                 infile.write_file(inname_update)
-                # Run Sushi with prepared input
-                subprocess.run([os.path.join(os.environ["THEORY_CODE_PATH"],
-                                              "SusHi-1.7.0",
-                                              "bin",
-                                              "sushi"),
-                                 os.path.relpath(inname_update),
-                                 os.path.relpath(inname_update.replace("in", "out").replace("_output", ""))])  # noqa: E501
+                # Run Sushi with prepared input once a slot is free
+                if len(running) >= self._pdf_workers:
+                    running.popleft().wait()
+                running.append(_start_command(
+                    [self._sushi, inname_update,
+                     self._outputfile.format(*point, pdf_suffix)]))
+            for process in running:
+                process.wait()
         return
 
     def harvest_output(self, model_point):
@@ -2,10 +2,20 @@
 
 import unittest
 import math
+import os
+import tempfile
 
-from thdm_scanner import lha_utils
+import numpy as np
+
+from thdm_scanner import grid, lha_utils
 from thdm_scanner.utility import utils
 
+try:
+    # Only available with law_config on the python path, see setup.sh
+    from analysis import tasks as law_tasks
+except ImportError:
+    law_tasks = None
+
 
 class DToSConversionUtility(unittest.TestCase):
 
@@ -26,6 +36,308 @@ class DToSConversionUtility(unittest.TestCase):
         self.assertEqual(utils.trim_zeros_from_dstr("125.050"), "125.05")
 
 
+class ParameterExpressionTestCase(unittest.TestCase):
+
+    def test_number_inputs(self):
+        self.assertEqual(grid.THDMInput(cos_betal=0.3).cos_betal, 0.3)
+        self.assertEqual(grid.THDMInput(cos_betal="0.3").cos_betal, 0.3)
+        self.assertEqual(grid.THDMInput(cos_betal="-1e-1").cos_betal, -0.1)
+
+    def test_expression_inputs(self):
+        self.assertAlmostEqual(
+                grid.THDMInput(cos_betal="math.cos(math.pi/3)").cos_betal,
+                0.5)
+        self.assertAlmostEqual(grid.THDMInput(cos_betal="cos(pi/3)").cos_betal,
+                               0.5)
+        self.assertAlmostEqual(
+                grid.THDMInput(cos_betal="Z4/10", Z4=1.).cos_betal, 0.1)
+        self.assertAlmostEqual(
+                grid.THDMInput(cos_betal="1/tanb", tanb=4.).cos_betal, 0.25)
+
+    def test_physics_expression_inputs(self):
+        inp = grid.THDMPhysicsInput(mH=400., mA="mH", mHp="mA + 10",
+                                    cos_betal="0.1*lambda6", lambda6=1.,
+                                    m12_square="mA**2*cos_betal")
+        self.assertEqual(inp.mA, 400.)
+        self.assertEqual(inp.mHp, 410.)
+        self.assertAlmostEqual(inp.cos_betal, 0.1)
+        self.assertAlmostEqual(inp.m12_square, 16000.)
+
+    def test_rejected_expressions(self):
+        for expr in ("__import__('os')", "().__class__", "mh.real",
+                     "[0.1][0]", "unknown + 1", "math.__dict__",
+                     "mh(1)", "math.cos(x=1)"):
+            with self.subTest(expr=expr):
+                with self.assertRaises(ValueError):
+                    grid.THDMInput(cos_betal=expr)
+
+
+class THDMModelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.model = grid.THDMModel("test_model",
+                                    {"mH": [200., 300., 50.],
+                                     "tanb": [1., 3., 1.]},
+                                    {})
+
+    def test_parameter_points(self):
+        self.assertEqual([(val_1, val_2) for (_, val_1), (_, val_2)
+                          in self.model.parameter_points()],
+                         [(200., 1.), (200., 2.), (250., 1.), (250., 2.)])
+
+    def test_grid_shape(self):
+        # Two bins per axis plus under- and overflow bins
+        self.assertEqual(self.model.grid_shape,
+                         (4, 4, len(self.model.quantities)))
+
+    def test_bin_index(self):
+        for (mH, tanb), index in (((200., 1.), (1, 1)),
+                                  ((250., 1.), (1, 2)),
+                                  ((200., 2.), (2, 1)),
+                                  ((250., 2.), (2, 2)),
+                                  ((100., 1.), (1, 0)),
+                                  ((400., 5.), (3, 3))):
+            point = grid.THDMPoint(("mH", "tanb"), (mH, tanb))
+            self.assertEqual(self.model.bin_index(point), index)
+            # The order of the parameters of the point does not matter
+            point = grid.THDMPoint(("tanb", "mH"), (tanb, mH))
+            self.assertEqual(self.model.bin_index(point), index)
+
+    def test_set_results(self):
+        results = np.ones(self.model.grid_shape)
+        self.model.set_results(results)
+        self.assertIs(self.model.results(), results)
+        with self.assertRaises(ValueError):
+            self.model.set_results(np.ones((2, 2, 1)))
+        self.model.clear_points()
+        self.assertFalse(self.model.results().any())
+
+
+_LHA_SAMPLE = ("# 2HDMC output\n"
+               "# second comment line\n"
+               "Block THDM # validity\n"
+               "    1   1   # valid parameters\n"
+               "    2   1   # unitarity\n"
+               "    3   1   # perturbativity\n"
+               "    4   0   # stability\n"
+               "Block MASS\n"
+               "   25   1.25000000e+02   # h\n"
+               "   36   4.00000000e+02   # A\n"
+               "Block VCKM Q= 9.1e+01 # CKM matrix\n"
+               "    1    2   2.25e-01   # V_12\n"
+               "Block ALPHA   # mixing angle\n"
+               "     -1.1e-01   # alpha\n"
+               "DECAY   25   4.1e-03   # h decays\n"
+               "#    BR         NDA      ID1       ID2\n"
+               "     6.2e-02    2       15       -15\n"
+               "     5.8e-01    2        5        -5\n")
+
+_LHA_SAMPLE_WRITTEN = ("# 2HDMC output\n"
+                       "# second comment line\n"
+                       "Block THDM # validity\n"
+                       "    1\t1 #  valid parameters\n"
+                       "    2\t1 #  unitarity\n"
+                       "    3\t1 #  perturbativity\n"
+                       "    4\t0 #  stability\n"
+                       "Block MASS\n"
+                       "   25\t1.25000000e+02 #  h\n"
+                       "   36\t4.00000000e+02 #  A\n"
+                       "Block VCKM # Q= 9.1e+01 # CKM matrix\n"
+                       "    1    2\t2.25e-01 #  V_12\n"
+                       "Block ALPHA # mixing angle\n"
+                       "     \t-1.1e-01 #  alpha\n"
+                       "DECAY\t25\t4.1e-03\t# h decays\n"
+                       "#\t BR \t NDA \t ID1 \t ID2\n"
+                       "6.2e-02\t2\t15\t-15\n"
+                       "5.8e-01\t2\t5\t-5")
+
+
+class LHAFileTestCase(unittest.TestCase):
+
+    def write_tmp(self, content):
+        fd, fname = tempfile.mkstemp(suffix=".lha")
+        self.addCleanup(os.remove, fname)
+        with os.fdopen(fd, "w") as fo:
+            fo.write(content)
+        return fname
+
+    def read_lha(self, content, lha_class=lha_utils.LHAFile):
+        fname = self.write_tmp(content)
+        if lha_class is lha_utils.LHAFile:
+            lha_file = lha_class(fname)
+            lha_file.read_file()
+            return lha_file
+        # Output classes read the file on construction
+        return lha_class(fname)
+
+    def write_lha(self, lha_file):
+        fname = self.write_tmp("")
+        lha_file.write_file(fname)
+        with open(fname, "r") as fi:
+            return fi.read()
+
+    def test_block_headers(self):
+        lha_file = self.read_lha("Block SUSHI # SusHi inputs\n"
+                                 "  1   2   # model\n"
+                                 "Block YU Q= 9.1e+01 # up-type Yukawas\n"
+                                 "  3  3  8.9e-01   # y_t(Q)\n"
+                                 "BLOCK MASS\n"
+                                 "  25  1.25e+02\n")
+        self.assertEqual(lha_file._get_entry_value("SUSHI", "1"), "2")
+        self.assertEqual(lha_file._get_entry_value("YU", "3,3"), "8.9e-01")
+        self.assertEqual(lha_file._get_entry_value("MASS", "25"), "1.25e+02")
+        self.assertEqual(str(lha_file._block_index["YU"]).split("\n")[0],
+                         "Block YU # Q= 9.1e+01 # up-type Yukawas")
+
+    def test_entries(self):
+        lha_file = self.read_lha(_LHA_SAMPLE)
+        self.assertEqual(lha_file._get_entry_value("THDM", "4"), "0")
+        self.assertEqual(lha_file._get_entry_value("MASS", "36"),
+                         "4.00000000e+02")
+        # CKM like entries are identified by both indices
+        self.assertEqual(lha_file._get_entry_value("VCKM", "1,2"),
+                         "2.25e-01")
+        # Entries with only a value have an empty name
+        self.assertEqual(lha_file._get_entry_value("ALPHA", ""), "-1.1e-01")
+        with self.assertRaises(KeyError):
+            lha_file._get_entry_value("MASS", "35")
+        with self.assertRaises(KeyError):
+            lha_file._get_entry_value("NOBLOCK", "1")
+
+    def test_decays(self):
+        lha_file = self.read_lha(_LHA_SAMPLE)
+        self.assertEqual(lha_file._get_branching_ratio("25", ("15", "-15")),
+                         "6.2e-02")
+        self.assertEqual(lha_file._get_entry_value("25", "5,-5"), "5.8e-01")
+        # Missing decays have a branching ratio of zero
+        self.assertEqual(lha_file._get_branching_ratio("25", ("6", "-6")),
+                         "0.")
+        with self.assertRaises(KeyError):
+            lha_file._get_branching_ratio("35", ("15", "-15"))
+        with self.assertRaises(NotImplementedError):
+            lha_file._set_entry_value("25", "15,-15", "1.")
+
+    def test_write_file(self):
+        lha_file = self.read_lha(_LHA_SAMPLE)
+        self.assertEqual(self.write_lha(lha_file), _LHA_SAMPLE_WRITTEN)
+
+    def test_round_trip(self):
+        written = self.write_lha(self.read_lha(_LHA_SAMPLE))
+        self.assertEqual(self.write_lha(self.read_lha(written)), written)
+
+    def test_set_entry_value(self):
+        lha_file = self.read_lha(_LHA_SAMPLE)
+        # Format the entry before changing it
+        self.assertEqual(str(lha_file._block_index["MASS"]).split("\n")[1],
+                         "   25\t1.25000000e+02 #  h")
+        lha_file._set_entry_value("MASS", "25", "1.2538d2")
+        self.assertEqual(lha_file._get_entry_value("MASS", "25"), "1.2538d2")
+        self.assertEqual(str(lha_file._block_index["MASS"]).split("\n")[1],
+                         "   25\t1.2538d2 #  h")
+        self.assertIn("   25\t1.2538d2 #  h\n", self.write_lha(lha_file))
+        with self.assertRaises(ValueError):
+            lha_file._set_entry_value("THDM", "1", "2", choices={"0", "1"})
+        with self.assertRaises(KeyError):
+            lha_file._set_entry_value("MASS", "35", "2.d2")
+
+    def test_duplicate_entries(self):
+        block = lha_utils.LHABlock("MASS")
+        block.add_entry_from_vals("25", "125.d0", "h")
+        with self.assertRaises(ValueError):
+            block.add_entry_from_vals("25", "126.d0", "h")
+        decay = lha_utils.DecayBlock("25", "4.1e-03")
+        decay.add_branching_ratio(lha_utils.DecayEntry("15", "-15",
+                                                       "6.2e-02", "2"))
+        with self.assertRaises(ValueError):
+            decay.add_branching_ratio(lha_utils.DecayEntry("15", "-15",
+                                                           "6.3e-02", "2"))
+
+    def test_thdmc_output(self):
+        thdmc_out = self.read_lha(_LHA_SAMPLE, lha_utils.THDMCOutput)
+        self.assertTrue(thdmc_out.valid_params)
+        self.assertTrue(thdmc_out.perturbativity)
+        self.assertFalse(thdmc_out.stability)
+        self.assertFalse(thdmc_out.valid_model)
+        self.assertEqual(thdmc_out.mh, 125.)
+        self.assertEqual(thdmc_out.mA, 400.)
+        self.assertEqual(thdmc_out.br_htautau, 6.2e-02)
+
+    def test_sushi_output(self):
+        sushi_out = self.read_lha("Block SUSHIggh # ggh xsec\n"
+                                  "    1   4.80455095E+01   # ggh XS in pb\n"
+                                  "  102  -5.07690730E+00   # down\n"
+                                  "  103   4.78036642E+00   # up\n"
+                                  "Block SUSHIbbh # bbh xsec\n"
+                                  "    1   3.50229376E+01   # bbh XS in pb\n"
+                                  "Block MASSOUT\n"
+                                  "    1   1.25000000E+02   # m_Phi\n",
+                                  lha_utils.SusHiOutput)
+        self.assertEqual(sushi_out.xs_ggPhi, 4.80455095E+01)
+        self.assertEqual(sushi_out.xs_ggPhi_scale_down, -5.07690730E+00)
+        self.assertEqual(sushi_out.xs_ggPhi_scale_up, 4.78036642E+00)
+        self.assertEqual(sushi_out.xs_bbPhi, 3.50229376E+01)
+        self.assertEqual(sushi_out.mPhi, 125.)
+
+    def test_sushi_input_round_trip(self):
+        sushi_input = lha_utils.SusHiInput(self.write_tmp(""))
+        sushi_input.mh = 125.38
+        sushi_input.pdf_set = 3
+        sushi_input.write_file()
+        lha_file = lha_utils.LHAFile(sushi_input.filename)
+        lha_file.read_file()
+        self.assertEqual(lha_file._get_entry_value("2HDMC", "21"), "125.38d0")
+        self.assertEqual(lha_file._get_entry_value("2HDMC", "31"), "125.38d0")
+        self.assertEqual(lha_file._get_entry_value("PDFSPEC", "13"), "3")
+        self.assertEqual(self.write_lha(lha_file),
+                         self.write_lha(sushi_input))
+
+
+@unittest.skipIf(law_tasks is None, "law environment not set up")
+class ScenarioCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.yaml_path = os.path.join(self.tmp_dir.name, "scenario.yaml")
+        self.cache_dir = os.path.join(self.tmp_dir.name, ".cache")
+        # Bypass the per process cache to test the cache files
+        self.load = law_tasks._load_scenario.__wrapped__
+
+    def write_yaml(self, content):
+        with open(self.yaml_path, "w") as fo:
+            fo.write(content)
+
+    def test_cache_written(self):
+        self.write_yaml("name: first\n")
+        self.assertEqual(self.load(self.yaml_path), {"name": "first"})
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        # Second load is served from the cache
+        self.assertEqual(self.load(self.yaml_path), {"name": "first"})
+
+    def test_corrupt_cache(self):
+        self.write_yaml("name: first\n")
+        self.load(self.yaml_path)
+        cache_file, = os.listdir(self.cache_dir)
+        for content in (b"", b"\x80\x05garbage"):
+            with open(os.path.join(self.cache_dir, cache_file), "wb") as fo:
+                fo.write(content)
+            self.assertEqual(self.load(self.yaml_path), {"name": "first"})
+        self.assertEqual(os.listdir(self.cache_dir), [cache_file])
+
+    def test_changed_yaml(self):
+        self.write_yaml("name: first\n")
+        self.load(self.yaml_path)
+        old_cache, = os.listdir(self.cache_dir)
+        # Edit within the same second keeping the size of the file
+        mtime_ns = os.stat(self.yaml_path).st_mtime_ns
+        self.write_yaml("name: other\n")
+        os.utime(self.yaml_path, ns=(mtime_ns + 1, mtime_ns + 1))
+        self.assertEqual(self.load(self.yaml_path), {"name": "other"})
+        # The cache of the previous version is removed
+        new_cache, = os.listdir(self.cache_dir)
+        self.assertNotEqual(new_cache, old_cache)
+
+
 class SusHiInputTestCase(unittest.TestCase):
 
     def setUp(self):
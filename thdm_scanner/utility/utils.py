@@ -8,11 +8,11 @@ def d_to_fortran_s(value):
 
 def fortran_s_to_d(value):
     """Converts fortran real string to python float"""
-    val, exp = value.split("d")
-    return float(val) * 10 ** int(exp)
+    # Parse the exponent together with the mantissa, this also avoids
+    # the rounding of the separate multiplication
+    return float(value.replace("d", "e"))
 
 
 def trim_zeros_from_dstr(in_str):
     int_val, dec_val = in_str.split(".")
-    val_str = ".".join([int_val, dec_val.rstrip("0")])
-    return val_str
+    return int_val + "." + dec_val.rstrip("0")